@@ -1,4 +1,5 @@
 from tasks_allocation_package.classes import Planner
+from tasks_allocation_package.snapshot import save_planner, load_planner, is_snapshot_fresh
 
 import datetime as dt
 import os
@@ -6,16 +7,22 @@ import os
 if __name__ == "__main__":
     tasks_file_name = os.path.join("data_files", "tasks8.txt")
     days_file_name = os.path.join("data_files", "days8.txt")
+    snapshot_file_name = "planner_snapshot.pickle"
 
     default_task_work_hours = 2
     default_day_work_hours = 4
 
     start_date = dt.date(day=1, month=1, year=2025)
     # start_date = dt.date.today()
-    tasks = Planner.read_tasks_from_file(tasks_file_name, default_task_work_hours)
-    days = Planner.read_days_from_file(days_file_name, default_day_work_hours)
-    planner = Planner(tasks, days, start_date=start_date, dflt_day_work_hours=default_day_work_hours,
-                         dflt_task_work_hours=default_task_work_hours)
+    planner_params = {"start_date": start_date, "dflt_day_work_hours": default_day_work_hours,
+                      "dflt_task_work_hours": default_task_work_hours, "horizon_weeks": None}
+    if is_snapshot_fresh(snapshot_file_name, tasks_file_name, days_file_name, params=planner_params):
+        planner = load_planner(snapshot_file_name)
+    else:
+        tasks = Planner.read_tasks_from_file(tasks_file_name, default_task_work_hours)
+        days = Planner.read_days_from_file(days_file_name, default_day_work_hours)
+        planner = Planner(tasks, days, **planner_params)
+        save_planner(planner, snapshot_file_name)
 
     print(planner.present_tasks_str_rus(), end="")
     allocation_types = [
@@ -24,6 +31,7 @@ if __name__ == "__main__":
         (Planner.interest_importance_allocation, "Распределение по важности умноженной на интерес"),
         (Planner.points_allocation, "Распределение по важности, умноженной на часы"),
         (Planner.force_procrastinate_allocation, 'Распределение "принудительная прокрастинация"'),
+        (Planner.aging_allocation, "Распределение по дням с повышением приоритета у близких дедлайнов"),
     ]
     print("Виды распределений:")
     for i in range(len(allocation_types)):
@@ -0,0 +1,116 @@
+import argparse
+import datetime as dt
+import random
+import sys
+import time
+
+from tasks_allocation_package.classes import Task, Day, Planner
+from tasks_allocation_package.reference import ReferencePlanner
+
+ALLOCATIONS = [
+    "importance_allocation",
+    "interest_allocation",
+    "interest_importance_allocation",
+    "points_allocation",
+    "force_procrastinate_allocation",
+]
+
+# engines checked against ReferencePlanner, each built as engine(tasks, manual_days, start_date, dflt_day_work_hours)
+ENGINES = {
+    "planner": lambda tasks, manual_days, start_date, dflt_day_work_hours: Planner(
+        tasks, manual_days, start_date=start_date, dflt_day_work_hours=dflt_day_work_hours),
+}
+
+
+def generate_case(rng: random.Random, max_tasks: int, max_days: int) -> dict:
+    start_date = dt.date(2025, 1, 1) + dt.timedelta(days=rng.randrange(365))
+    horizon = rng.randint(1, max_days)
+    tasks = []
+    for i in range(rng.randint(0, max_tasks)):
+        deadline = None
+        if rng.random() < 0.7:
+            # a few deadlines fall on or before the start date and must be filtered out
+            deadline = start_date + dt.timedelta(days=rng.randint(-2, horizon))
+        tasks.append(dict(name=f"task {i}", deadline=deadline, interest=rng.randint(1, 10),
+                          work_hours=rng.randint(1, 12), importance=rng.randint(1, 10)))
+    manual_days = {}
+    for _ in range(rng.randint(0, horizon)):
+        manual_days[start_date + dt.timedelta(days=rng.randrange(horizon + 5))] = rng.choice([0, 0, 1, 2, 3, 6, 8])
+    return dict(start_date=start_date, dflt_day_work_hours=rng.randint(1, 8), tasks=tasks, manual_days=manual_days)
+
+
+def get_schedule(planner) -> [(dt.date, int, [(int, int)])]:
+    return [(day.date, day.work_hours, [(task.id, work_hours) for task, work_hours in day.schedule.items()])
+            for day in planner.calendar.days]
+
+
+def run_allocation(planner_init, case: dict, tasks: [Task], allocation: str) -> (list, [int], float):
+    manual_days = [Day(date, work_hours) for date, work_hours in case["manual_days"].items()]
+    start = time.perf_counter()
+    planner = planner_init(tasks, manual_days, case["start_date"], case["dflt_day_work_hours"])
+    getattr(planner, allocation)()
+    elapsed = time.perf_counter() - start
+    return get_schedule(planner), sorted(task.id for task in planner.failed_tasks), elapsed
+
+
+def find_mismatch(case: dict, engine_init, allocation: str) -> (bool, float, float):
+    # the same Task objects go to both planners, so ids and set iteration orders match
+    tasks = [Task(**task_kwargs, task_id=i) for i, task_kwargs in enumerate(case["tasks"])]
+    reference_init = lambda tasks, manual_days, start_date, dflt_day_work_hours: ReferencePlanner(
+        tasks, manual_days, start_date, dflt_day_work_hours)
+    expected_schedule, expected_failed, reference_time = run_allocation(reference_init, case, tasks, allocation)
+    schedule, failed, engine_time = run_allocation(engine_init, case, tasks, allocation)
+    return (schedule != expected_schedule or failed != expected_failed), reference_time, engine_time
+
+
+def shrink_case(case: dict, engine_init, allocation: str) -> dict:
+    """
+    Drops tasks and manual days one by one while the engine still disagrees with the reference.
+    """
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(case["tasks"]) - 1, -1, -1):
+            smaller = dict(case, tasks=case["tasks"][:i] + case["tasks"][i + 1:])
+            if find_mismatch(smaller, engine_init, allocation)[0]:
+                case, changed = smaller, True
+        for date in list(case["manual_days"]):
+            smaller = dict(case, manual_days={d: h for d, h in case["manual_days"].items() if d != date})
+            if find_mismatch(smaller, engine_init, allocation)[0]:
+                case, changed = smaller, True
+    return case
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare allocation engines with the frozen reference planner")
+    parser.add_argument("--cases", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-tasks", type=int, default=60)
+    parser.add_argument("--max-days", type=int, default=120)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    speedups = {(engine, allocation): [] for engine in ENGINES for allocation in ALLOCATIONS}
+    for case_i in range(args.cases):
+        case = generate_case(rng, args.max_tasks, args.max_days)
+        for engine, engine_init in ENGINES.items():
+            for allocation in ALLOCATIONS:
+                mismatch, reference_time, engine_time = find_mismatch(case, engine_init, allocation)
+                if mismatch:
+                    print(f"case {case_i}: {engine} differs from the reference in {allocation}")
+                    print(f"minimal case: {shrink_case(case, engine_init, allocation)}")
+                    return 1
+                speedups[(engine, allocation)].append(reference_time / max(engine_time, 1e-9))
+                print(f"case {case_i} {engine} {allocation}: {len(case['tasks'])} tasks, "
+                      f"speedup {speedups[(engine, allocation)][-1]:.2f}x")
+
+    print(f"{args.cases} cases identical to the reference")
+    for (engine, allocation), values in speedups.items():
+        values.sort()
+        print(f"{engine} {allocation}: median speedup {values[len(values) // 2]:.2f}x, "
+              f"min {values[0]:.2f}x, max {values[-1]:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
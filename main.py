@@ -1,32 +1,17 @@
-from telegram import (Update,
-                      InlineKeyboardButton,
-                      InlineKeyboardMarkup,
-                      ReplyKeyboardMarkup,
-                      KeyboardButton)
-from telegram.ext import (Application,
-                          ConversationHandler,
-                          MessageHandler,
-                          CommandHandler,
-                          ContextTypes,
-                          InlineQueryHandler,
-                          CallbackQueryHandler,
-                          filters)
+from __future__ import annotations
 
+import datetime as dt
 import logging
+import os
+import time
+from typing import TYPE_CHECKING
 
-from tasks_allocation_package.classes_utils import *
-from tasks_allocation_package.utils import *
+# python-telegram-bot and the planner package are imported in main() and in the handlers,
+# so importing this module stays cheap and the process answers sooner after a restart
+if TYPE_CHECKING:
+    from telegram import Update
+    from telegram.ext import Application, ContextTypes
 
-from hid_vars import bot_token
-
-# logging.basicConfig(
-#     format="time: %(act_time)s, name: %(name)s, level: %(levelname)s, message: %(message)s",
-#     level=logging.INFO
-# )
-logging.basicConfig(
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
-)
-logging.getLogger("httpx").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
 LEVELS = zip(("MAIN_MENU", "SCHEDULE", "DAY"), map(chr, range(0, 3)))
@@ -55,10 +40,18 @@ LEVELS = zip(("MAIN_MENU", "SCHEDULE", "DAY"), map(chr, range(0, 3)))
     TO_ABOUT, SELECTING_IN_ABOUT,
     STOP_ALL
 ) = map(chr, range(17))
-END = ConversationHandler.END
+END = -1  # ConversationHandler.END
+
+PLANNER_SNAPSHOT_ENV = "PLANNER_SNAPSHOT"
+
+ROLLOVER_TIME = dt.time(hour=0, minute=1)
+ROLLOVER_BATCH_SIZE = 50
+ROLLOVER_WORKERS = os.cpu_count() or 1
 
 
 def get_main_menu_keyboard():
+    from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
     buttons = [
         [
             InlineKeyboardButton(text="Расписание", callback_data=TO_SCHEDULE_MENU),
@@ -73,6 +66,8 @@ def get_main_menu_keyboard():
 
 
 def get_back_keyboard():
+    from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
     buttons = [
         [
             InlineKeyboardButton(text="Назад", callback_data=END),
@@ -129,15 +124,13 @@ async def show_about(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str:
 
 async def show_schedule(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str:
     text = "Вот ваше расписание:"
-    schedule_keyboard = [
-        [InlineKeyboardButton(text="Назад", callback_data=)],
-    ]
-    schedule_markup = ReplyKeyboardMarkup(keyboard=schedule_keyboard, resize_keyboard=True, one_time_keyboard=True)
     await update.callback_query.answer()
-    await update.message.reply_text(text=text, reply_markup=schedule_markup)
-    for work_day in context.user_data["work_days"]:
-        await.update.message.reply_text()
+    await update.callback_query.edit_message_text(text=text, reply_markup=get_back_keyboard())
+    planner = context.user_data.get("planner", context.bot_data.get("planner"))
+    if planner is not None:
+        await update.callback_query.message.reply_text(text=planner.calendar_with_schedule_str_rus())
     #     TODO: вывод каждого рабочего дня
+    return SELECTING_IN_SCHEDULE_MENU
 
 
 async def show_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str:
@@ -173,20 +166,113 @@ async def back_to_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return END
 
 
-def main() -> None:
-    application = Application.builder().token(bot_token).build()
+async def rollover_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Daily job: rolls the plans that start before today forward, re-plans them in batches in worker processes
+    and sends every affected user a short update about the new day. The shared planner of bot_data goes along
+    as user None, it is re-planned in place and no update is sent for it.
+    """
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+
+    from telegram.error import TelegramError
+
+    from tasks_allocation_package.rollover import DFLT_ALLOCATION, is_plan_stale, replan_batch, shard
+
+    run_start = time.perf_counter()
+    today = dt.date.today()
+    user_data = context.application.user_data
+    plans_data = [(None, context.bot_data)] + list(user_data.items())
+    stale_users = [(user_id, data["planner"], data.get("allocation", DFLT_ALLOCATION))
+                   for user_id, data in plans_data
+                   if "planner" in data and is_plan_stale(data["planner"], today)]
+    batches = shard(stale_users, ROLLOVER_BATCH_SIZE)
+    if not batches:
+        logger.info("Rollover to %s: no plans to update", today)
+        return
+    sent_planners = {user_id: planner for user_id, planner, _ in stale_users}
+
+    loop = asyncio.get_running_loop()
+    sent_count = 0
+    skipped_count = 0
+    failed_count = 0
+    batch_seconds = 0.0
+    with ProcessPoolExecutor(max_workers=min(ROLLOVER_WORKERS, len(batches))) as executor:
+        async def run_batch(batch):
+            try:
+                return await loop.run_in_executor(executor, replan_batch, batch, today)
+            except Exception as e:
+                # the whole batch was lost, e.g. a planner could not be pickled or a worker died
+                logger.exception("Rollover batch of %d plans failed", len(batch))
+                return [], [(user_id, repr(e)) for user_id, _, _ in batch], 0.0
+
+        for future in asyncio.as_completed([run_batch(batch) for batch in batches]):
+            results, failures, seconds = await future
+            batch_seconds += seconds
+            failed_count += len(failures)
+            for user_id, error in failures:
+                logger.warning("Rollover of the plan of user %s failed: %s", user_id, error)
+            for user_id, planner, text in results:
+                data = context.bot_data if user_id is None else user_data.get(user_id, {})
+                # the plan was replaced while the batch ran, the newer plan is kept
+                if data.get("planner") is not sent_planners[user_id]:
+                    skipped_count += 1
+                    continue
+                data["planner"] = planner
+                if user_id is None:
+                    continue
+                try:
+                    await context.bot.send_message(chat_id=user_id, text=text)
+                    sent_count += 1
+                except TelegramError as e:
+                    logger.warning("Rollover update for user %s was not sent: %s", user_id, e)
+
+    logger.info("Rollover to %s: %d of %d plans re-planned in %d batches (%d failed, %d changed meanwhile and "
+                "kept), %.2f s total, %.2f s in workers, %d updates sent", today, len(stale_users), len(plans_data),
+                len(batches), failed_count, skipped_count, time.perf_counter() - run_start, batch_seconds,
+                sent_count)
+
+
+def load_planner_snapshot(file_name: str):
+    from tasks_allocation_package.snapshot import load_planner
+
+    planner = load_planner(file_name)
+    logger.info("Loaded planner snapshot %s with %d tasks", file_name, len(planner.tasks))
+    return planner
+
+
+def build_application(token: str, planner_snapshot: str = None) -> Application:
+    from telegram.ext import (Application,
+                              ConversationHandler,
+                              MessageHandler,
+                              CommandHandler,
+                              CallbackQueryHandler,
+                              filters)
+
+    application = Application.builder().token(token).build()
+    if planner_snapshot is not None and os.path.exists(planner_snapshot):
+        application.bot_data["planner"] = load_planner_snapshot(planner_snapshot)
+    if application.job_queue is not None:
+        # the snapshot may be days old, so it is rolled forward right after the start as well
+        application.job_queue.run_once(rollover_job, when=0, name="rollover_on_start")
+        application.job_queue.run_daily(rollover_job, time=ROLLOVER_TIME, name="rollover")
+    else:
+        logger.warning("JobQueue is not available, install python-telegram-bot[job-queue] for daily re-planning")
 
     add_task_conversation = ConversationHandler(
         entry_points=[
             CallbackQueryHandler(pattern=f"^{TO_ADD_TASK}$", callback=ask_task_name)
         ],
         states={
-            WRITING_TASK_NAME: MessageHandler(filters=filters.TEXT, callback=ask_task_deadline),
-            WRITING_TASK_DEADLINE: MessageHandler(filters=filters.TEXT, callback=ask_task_interest),
-            WRITING_TASK_INTEREST: MessageHandler(filters=filters.TEXT, callback=ask_task_work_hours),
-            WRITING_TASK_WORK_HOURS: MessageHandler(filters=filters.TEXT, callback=ask_task_must_do),
-            WRITING_TASK_MUST_DO: MessageHandler(filters=filters.TEXT, callback=add_task)
-        }
+            WRITING_TASK_NAME: [MessageHandler(filters=filters.TEXT, callback=ask_task_deadline)],
+            WRITING_TASK_DEADLINE: [MessageHandler(filters=filters.TEXT, callback=ask_task_interest)],
+            WRITING_TASK_INTEREST: [MessageHandler(filters=filters.TEXT, callback=ask_task_work_hours)],
+            WRITING_TASK_WORK_HOURS: [MessageHandler(filters=filters.TEXT, callback=ask_task_must_do)],
+            WRITING_TASK_MUST_DO: [MessageHandler(filters=filters.TEXT, callback=add_task)]
+        },
+        fallbacks=[
+            CommandHandler(command="stop", callback=stop),
+        ]
     )
 
     tasks_conversation = ConversationHandler(
@@ -195,18 +281,20 @@ def main() -> None:
         ],
         states={
 
-        }
+        },
+        fallbacks=[
+            CommandHandler(command="stop", callback=stop),
+        ]
     )
 
     schedule_menu_conv_handler = ConversationHandler(
         entry_points=[
-            CallbackQueryHandler(pattern=f"^{TO_SCHEDULE_MENU}$", callback=show_schedule_menu),
+            CallbackQueryHandler(pattern=f"^{TO_SCHEDULE_MENU}$", callback=show_schedule_main),
         ],
         states={
             SELECTING_IN_SCHEDULE_MENU: [
-                CallbackQueryHandler(pattern=f"{TO_SCHEDULE}", callback=),
-                CallbackQueryHandler(pattern=f"{TO_TASKS}"),
-                CallbackQueryHandler()
+                CallbackQueryHandler(pattern=f"{TO_SCHEDULE}", callback=show_schedule),
+                CallbackQueryHandler(pattern=f"{TO_TASKS}", callback=show_tasks),
             ]
         },
         fallbacks=[
@@ -275,6 +363,24 @@ def main() -> None:
     )
 
     application.add_handler(main_menu_conv_handler)
+    return application
+
+
+def main() -> None:
+    from telegram import Update
+
+    from hid_vars import bot_token
+
+    # logging.basicConfig(
+    #     format="time: %(act_time)s, name: %(name)s, level: %(levelname)s, message: %(message)s",
+    #     level=logging.INFO
+    # )
+    logging.basicConfig(
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
+    )
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    application = build_application(bot_token, os.environ.get(PLANNER_SNAPSHOT_ENV))
     application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 
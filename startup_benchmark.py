@@ -0,0 +1,89 @@
+import datetime as dt
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from tasks_allocation_package.classes import Planner
+from tasks_allocation_package.snapshot import save_planner
+
+# time from process launch until the application is built with its handlers and the planner snapshot loaded.
+# Application.initialize() and handling the first update need Telegram servers and are not included
+TIME_TO_APPLICATION_BUILT_TARGET = 1.0
+RUNS = 5
+
+IMPORT_MAIN_CODE = """
+import sys
+import main
+assert "telegram" not in sys.modules, "main imports telegram at module level"
+"""
+
+BUILD_APPLICATION_CODE = """
+import sys
+import main
+main.build_application("123456:benchmark", sys.argv[1])
+"""
+
+LOAD_FILES_CODE = """
+import datetime as dt
+import sys
+from tasks_allocation_package.classes import Planner
+tasks = Planner.read_tasks_from_file(sys.argv[1])
+days = Planner.read_days_from_file(sys.argv[2])
+Planner(tasks, days, start_date=dt.date(2024, 12, 15))
+"""
+
+LOAD_SNAPSHOT_CODE = """
+import sys
+from tasks_allocation_package.snapshot import load_planner
+load_planner(sys.argv[1])
+"""
+
+
+def measure_process(code: str, *args: str) -> float:
+    """
+    Best wall time of RUNS fresh interpreter launches, so module imports are paid every time.
+    """
+    best = None
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code, *args], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def has_telegram() -> bool:
+    return importlib.util.find_spec("telegram") is not None
+
+
+if __name__ == "__main__":
+    tasks_file_name = os.path.join("data_files", "tasks4.txt")
+    days_file_name = os.path.join("data_files", "days4.txt")
+    snapshot_file_name = os.path.join(tempfile.mkdtemp(), "planner_snapshot.pickle")
+    planner = Planner(Planner.read_tasks_from_file(tasks_file_name), Planner.read_days_from_file(days_file_name),
+                      start_date=dt.date(2024, 12, 15))
+    planner.importance_allocation()
+    save_planner(planner, snapshot_file_name)
+
+    results = [
+        ("python startup", measure_process("pass")),
+        ("import main", measure_process(IMPORT_MAIN_CODE)),
+        ("parse text files", measure_process(LOAD_FILES_CODE, tasks_file_name, days_file_name)),
+        ("load snapshot", measure_process(LOAD_SNAPSHOT_CODE, snapshot_file_name)),
+    ]
+    if has_telegram():
+        application_built = measure_process(BUILD_APPLICATION_CODE, snapshot_file_name)
+        results.append(("time to application built", application_built))
+    else:
+        application_built = None
+        print("python-telegram-bot is not installed, time to application built is not measured")
+
+    for name, seconds in results:
+        print(f"{name}: {seconds * 1000:.1f} ms")
+    if application_built is not None:
+        passed = application_built <= TIME_TO_APPLICATION_BUILT_TARGET
+        print(f"target {TIME_TO_APPLICATION_BUILT_TARGET * 1000:.0f} ms: {'ok' if passed else 'failed'}")
+        sys.exit(0 if passed else 1)
@@ -1,14 +1,19 @@
 import datetime as dt
+from array import array
+from bisect import bisect_left
+from heapq import heappush, heappop
+from itertools import accumulate
 
-from .utils import date_to_normal_str, to_str_instance, read_args_kwargs
+from .slots import FreeIntervals
+from .utils import date_to_normal_str, to_str_instance, read_args_kwargs, str_to_intervals, str_to_date
 
 
 class Task:
-    __id_counter = 0
+    __slots__ = ("_id", "_name", "_deadline", "_interest", "_work_hours", "_importance")
 
     def __init__(self, name: str, deadline: dt.date = None, interest: int = 5, work_hours: int = 2,
-                 importance: int = 5) -> None:
-        self._id: int = Task.__generate_id()
+                 importance: int = 5, task_id: int = None) -> None:
+        self._id: int = task_id
         self._name: str = name
         self._deadline: dt.date = deadline
         self._interest: int = interest
@@ -25,16 +30,20 @@ class Task:
                 f"interest={self.interest}, work_hours={self.work_hours}, "
                 f"importance={self.importance})")
 
-    @classmethod
-    def __generate_id(cls) -> int:
-        task_id = cls.__id_counter
-        cls.__id_counter += 1
-        return task_id
+    def __reduce__(self):
+        return Task, (self.name, self.deadline, self.interest, self.work_hours, self.importance, self.id)
 
     @property
     def id(self) -> int:
+        """
+        Unique within the planner the task belongs to, None until the task is given to a planner.
+        """
         return self._id
 
+    @id.setter
+    def id(self, task_id: int) -> None:
+        self._id = task_id
+
     @property
     def interest(self) -> int:
         return self._interest
@@ -77,7 +86,7 @@ class Task:
 
     @property
     def sum_interest(self) -> int:
-        return self._work_hours * self.interest
+        return self.work_hours * self.interest
 
     def has_deadline(self) -> bool:
         if self.deadline is not None:
@@ -93,11 +102,292 @@ class Task:
         return present_str
 
 
+class RecurringTask:
+    """
+    Definition of work repeated every interval_days: occurrence n is due first_deadline + n * interval_days.
+    Repeats count times, until the until date or forever. Occurrences are created by the planner only for
+    the dates it allocates and all of them read their attributes from this one object.
+    """
+
+    def __init__(self, name: str, first_deadline: dt.date, interval_days: int = 7, count: int = None,
+                 until: dt.date = None, interest: int = 5, work_hours: int = 2, importance: int = 5) -> None:
+        if interval_days < 1:
+            raise ValueError(f"Recurring task {name!r} must repeat at least every 1 day, got every {interval_days}")
+        self._name: str = name
+        self._first_deadline: dt.date = first_deadline
+        self._interval_days: int = interval_days
+        self._count: int = count
+        self._until: dt.date = until
+        self._interest: int = interest
+        self._work_hours: int = work_hours
+        self._importance: int = importance
+
+    def __repr__(self) -> str:
+        return (f"RecurringTask(name={self.name}, first_deadline={self.first_deadline}, "
+                f"interval_days={self.interval_days}, count={self.count}, until={self.until}, "
+                f"interest={self.interest}, work_hours={self.work_hours}, importance={self.importance})")
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def first_deadline(self) -> dt.date:
+        return self._first_deadline
+
+    @property
+    def interval_days(self) -> int:
+        return self._interval_days
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def until(self) -> dt.date:
+        return self._until
+
+    @property
+    def interest(self) -> int:
+        return self._interest
+
+    @property
+    def work_hours(self) -> int:
+        return self._work_hours
+
+    @property
+    def importance(self) -> int:
+        return self._importance
+
+    def get_deadline(self, index: int) -> dt.date:
+        return self.first_deadline + dt.timedelta(days=index * self.interval_days)
+
+    def occurrences(self, after_date: dt.date, end_date: dt.date):
+        """
+        Yields the occurrences due after after_date and not later than end_date.
+        """
+        days_after_first = (after_date - self.first_deadline).days
+        index = 0 if days_after_first < 0 else days_after_first // self.interval_days + 1
+        while self.count is None or index < self.count:
+            deadline = self.get_deadline(index)
+            if deadline > end_date or (self.until is not None and deadline > self.until):
+                break
+            yield TaskOccurrence(self, index)
+            index += 1
+
+
+class TaskOccurrence(Task):
+    """
+    One occurrence of a RecurringTask. Stores only the template and its number, everything else is read
+    from the template.
+    """
+    __slots__ = ("_template", "_index")
+
+    def __init__(self, template: RecurringTask, index: int, task_id: int = None) -> None:
+        self._template: RecurringTask = template
+        self._index: int = index
+        self._id: int = task_id
+
+    def __reduce__(self):
+        return TaskOccurrence, (self.template, self.index, self.id)
+
+    @property
+    def template(self) -> RecurringTask:
+        return self._template
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def name(self) -> str:
+        return self.template.name
+
+    @property
+    def deadline(self) -> dt.date:
+        return self.template.get_deadline(self.index)
+
+    @property
+    def interest(self) -> int:
+        return self.template.interest
+
+    @property
+    def work_hours(self) -> int:
+        return self.template.work_hours
+
+    @property
+    def importance(self) -> int:
+        return self.template.importance
+
+
+class Assignments:
+    """
+    Schedule of a whole calendar stored as parallel arrays of (task index, day index, hours) rows.
+    Rows are indexed both by task and by day, so "where is task X?" and "what is on day N?" need no calendar scan.
+    Hours of every day are kept as a running total, so checking how full a day is costs O(1).
+    """
+
+    def __init__(self) -> None:
+        self._tasks: [Task] = []
+        self._task_indexes: {Task: int} = {}
+        self._task_col: array = array("l")
+        self._day_col: array = array("l")
+        self._hours_col: array = array("l")
+        self._task_rows: [[int]] = []
+        self._day_rows: {int: [int]} = {}
+        self._rows: {(int, int): int} = {}
+        self._day_hours: array = array("l")
+
+    def __len__(self) -> int:
+        return len(self._hours_col)
+
+    def __getstate__(self) -> ([Task], array, array, array):
+        # removed rows are replaced by the last one, so rows are written day by day to keep the order of each day
+        rows = [row for day_i in sorted(self._day_rows) for row in self._day_rows[day_i]]
+        return (self._tasks, array("l", [self._task_col[row] for row in rows]),
+                array("l", [self._day_col[row] for row in rows]), array("l", [self._hours_col[row] for row in rows]))
+
+    def __setstate__(self, state: ([Task], array, array, array)) -> None:
+        tasks, task_col, day_col, hours_col = state
+        self.__init__()
+        self._tasks = tasks
+        self._task_indexes = {task: task_i for task_i, task in enumerate(tasks)}
+        self._task_rows = [[] for _ in tasks]
+        self._task_col, self._day_col, self._hours_col = task_col, day_col, hours_col
+        for row, (task_i, day_i, hours) in enumerate(zip(task_col, day_col, hours_col)):
+            self._task_rows[task_i].append(row)
+            self._day_rows.setdefault(day_i, []).append(row)
+            self._rows[(task_i, day_i)] = row
+            self.add_day_hours(day_i, hours)
+
+    def __iter__(self):
+        for task_i, day_i, hours in zip(self._task_col, self._day_col, self._hours_col):
+            yield self._tasks[task_i], day_i, hours
+
+    @property
+    def tasks(self) -> [Task]:
+        return self._tasks
+
+    def task_index(self, task: Task) -> int:
+        task_i = self._task_indexes.get(task)
+        if task_i is None:
+            task_i = len(self._tasks)
+            self._tasks.append(task)
+            self._task_indexes[task] = task_i
+            self._task_rows.append([])
+        return task_i
+
+    def add_day_hours(self, day_index: int, work_hours: int) -> None:
+        if day_index >= len(self._day_hours):
+            self._day_hours.extend([0] * (day_index + 1 - len(self._day_hours)))
+        self._day_hours[day_index] += work_hours
+
+    def add(self, task: Task, day_index: int, work_hours: int) -> None:
+        task_i = self.task_index(task)
+        self.add_day_hours(day_index, work_hours)
+        row = self._rows.get((task_i, day_index))
+        if row is not None:
+            self._hours_col[row] += work_hours
+            return
+        row = len(self._hours_col)
+        self._task_col.append(task_i)
+        self._day_col.append(day_index)
+        self._hours_col.append(work_hours)
+        self._task_rows[task_i].append(row)
+        self._day_rows.setdefault(day_index, []).append(row)
+        self._rows[(task_i, day_index)] = row
+
+    def day_schedule(self, day_index: int) -> {Task: int}:
+        return {self._tasks[self._task_col[row]]: self._hours_col[row] for row in self._day_rows.get(day_index, ())}
+
+    def day_hours(self, day_index: int) -> int:
+        return self._day_hours[day_index] if day_index < len(self._day_hours) else 0
+
+    def day_has_tasks(self, day_index: int) -> bool:
+        return day_index in self._day_rows
+
+    def task_schedule(self, task: Task) -> {int: int}:
+        task_i = self._task_indexes.get(task)
+        if task_i is None:
+            return {}
+        return {self._day_col[row]: self._hours_col[row] for row in self._task_rows[task_i]}
+
+    def task_hours(self, task: Task) -> int:
+        return sum(self.task_schedule(task).values())
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def clear_day(self, day_index: int) -> None:
+        for row in sorted(self._day_rows.pop(day_index, ()), reverse=True):
+            self.remove_row(row)
+        if day_index < len(self._day_hours):
+            self._day_hours[day_index] = 0
+
+    def remove_row(self, row: int) -> None:
+        """
+        Removes the row by moving the last row into its place, the per-task and per-day row order is kept.
+        The row must already be taken out of its day rows.
+        """
+        task_i = self._task_col[row]
+        del self._rows[(task_i, self._day_col[row])]
+        self._task_rows[task_i].remove(row)
+        last_row = len(self._hours_col) - 1
+        if row != last_row:
+            last_task_i, last_day_i = self._task_col[last_row], self._day_col[last_row]
+            self._task_col[row], self._day_col[row] = last_task_i, last_day_i
+            self._hours_col[row] = self._hours_col[last_row]
+            self._rows[(last_task_i, last_day_i)] = row
+            task_rows = self._task_rows[last_task_i]
+            task_rows[task_rows.index(last_row)] = row
+            day_rows = self._day_rows[last_day_i]
+            day_rows[day_rows.index(last_row)] = row
+        del self._task_col[last_row], self._day_col[last_row], self._hours_col[last_row]
+
+    def late_tasks(self, start_date: dt.date) -> {Task}:
+        """
+        Tasks having hours on or after their deadline, day index 0 being start_date.
+        """
+        start_ordinal = start_date.toordinal()
+        no_deadline = dt.date.max.toordinal() + 1
+        deadline_col = [no_deadline if task.deadline is None else task.deadline.toordinal() - start_ordinal
+                        for task in self._tasks]
+        return {self._tasks[task_i] for task_i, day_i in zip(self._task_col, self._day_col)
+                if day_i >= deadline_col[task_i]}
+
+    def to_rows(self, start_date: dt.date) -> [(int, dt.date, int)]:
+        return [(task.id, start_date + dt.timedelta(days=day_i), hours) for task, day_i, hours in self]
+
+
 class Day:
-    def __init__(self, date: dt.date, work_hours: int = 2, schedule: {Task: int} = None) -> None:
+    __slots__ = ("_date", "_work_hours", "_assignments", "_index", "_intervals")
+
+    def __init__(self, date: dt.date, work_hours: int = 2, schedule: {Task: int} = None,
+                 assignments: Assignments = None, index: int = 0, free_intervals: [(int, int)] = None,
+                 blocked_intervals: [(int, int)] = None) -> None:
+        """
+        With free_intervals the day is made of concrete free hours (e.g. [(9, 12), (18, 21)]), work_hours is
+        their total length minus blocked_intervals and tasks are placed into time slots.
+        """
         self._date: dt.date = date
         self._work_hours: int = work_hours
-        self._schedule: {Task: int} = {} if schedule is None else schedule
+        # a standalone day (e.g. a manual one) gets its own store only when a task is added to it
+        self._assignments: Assignments = assignments
+        self._index: int = index
+        self._intervals: FreeIntervals = None
+        if free_intervals is not None:
+            self._intervals = FreeIntervals(free_intervals)
+            self._work_hours = self._intervals.free_hours
+            for start, end in blocked_intervals or ():
+                self.block(start, end)
+        if schedule is not None:
+            self.schedule = schedule
+
+    def __reduce__(self):
+        return Day, (self.date, self.work_hours, None, self._assignments, self._index), self._intervals
+
+    def __setstate__(self, intervals: FreeIntervals) -> None:
+        self._intervals = intervals
 
     def __repr__(self) -> str:
         return f"Day(date={self.date}, day_work_hours={self.work_hours}, task_schedule={self.schedule})"
@@ -119,26 +409,77 @@ class Day:
 
     @work_hours.setter
     def work_hours(self, work_hours: int) -> None:
+        # a plain number of hours replaces the time slots
         self._work_hours = work_hours
+        self._intervals = None
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def assignments(self) -> Assignments:
+        if self._assignments is None:
+            self._assignments = Assignments()
+        return self._assignments
+
+    @property
+    def intervals(self) -> FreeIntervals:
+        return self._intervals
+
+    @intervals.setter
+    def intervals(self, intervals: FreeIntervals) -> None:
+        self._intervals = intervals
+
+    @property
+    def free_intervals(self) -> [(int, int)]:
+        return None if self._intervals is None else self._intervals.intervals
+
+    @property
+    def slots(self) -> [(int, int, Task)]:
+        return [] if self._intervals is None else self._intervals.slots
 
     @property
     def schedule(self) -> {Task: int}:
-        return self._schedule
+        if self._assignments is None:
+            return {}
+        return self._assignments.day_schedule(self._index)
 
     @schedule.setter
     def schedule(self, schedule: {Task: int}) -> None:
-        self._schedule = schedule
+        self.clean_schedule()
+        for task, work_hours in schedule.items():
+            if self._intervals is not None:
+                self._intervals.fill(task, work_hours)
+            self.assignments.add(task, self._index, work_hours)
 
     @property
     def sum_hours(self) -> int:
-        return sum(self.schedule.values())
+        if self._assignments is None:
+            return 0
+        return self._assignments.day_hours(self._index)
 
     @property
     def free_hours(self) -> int:
-        return self.work_hours - self.sum_hours
+        return self._work_hours - self.sum_hours
 
     def clean_schedule(self):
-        self.schedule = {}
+        if self._assignments is not None:
+            self._assignments.clear_day(self._index)
+        self.clean_slots()
+
+    def clean_slots(self) -> None:
+        if self._intervals is not None:
+            self._intervals.reset()
+
+    def block(self, start: int, end: int) -> None:
+        """
+        Takes [start, end) out of the free time of the day, e.g. for a meeting. Already placed slots are kept
+        until the schedule is cleaned, later allocations do not use the blocked time.
+        """
+        if self._intervals is None:
+            raise ValueError(f"Day {self.date} has no time intervals to block")
+        self._work_hours -= self._intervals.block(start, end)
 
     def add_task(self, task: Task, work_hours: int) -> int:
         if self.sum_hours + work_hours <= self.work_hours:
@@ -146,34 +487,53 @@ class Day:
         else:
             add_work_hours = self.work_hours - self.sum_hours
         return_work_hours = work_hours - add_work_hours
-        self.schedule[task] = self.schedule.get(task, 0) + add_work_hours
+        if self._intervals is not None:
+            self._intervals.fill(task, add_work_hours)
+        self.assignments.add(task, self._index, add_work_hours)
         return return_work_hours
 
+    def place_task(self, task: Task, work_hours: int, best_fit: bool = False) -> (int, int):
+        """
+        Places the hours as one slot into the first (or the shortest, with best_fit) free interval long enough.
+        Returns the slot or None if there is no such interval.
+        """
+        if self._intervals is None:
+            raise ValueError(f"Day {self.date} has no time intervals to place a task into")
+        slot = self._intervals.place(task, work_hours, best_fit)
+        if slot is not None:
+            self.assignments.add(task, self._index, work_hours)
+        return slot
+
     def is_weekend(self) -> bool:
         if self.work_hours == 0:
             return True
         return False
 
     def is_task_filled(self) -> bool:
-        if self.work_hours == self.sum_hours:
+        if self._work_hours == self.sum_hours:
             return True
         return False
 
     def has_tasks(self) -> bool:
-        if len(self.schedule) != 0:
-            return True
-        return False
+        return self._assignments is not None and self._assignments.day_has_tasks(self._index)
 
 
 class Calendar:
     def __init__(self, manual_days: [Day] = None, start_date: dt.date = dt.date.today(),
-                 dflt_day_work_hours: int = 4, dflt_task_work_hours: int = 2, max_date: dt.date = None) -> None:
+                 dflt_day_work_hours: int = 4, dflt_task_work_hours: int = 2, max_date: dt.date = None,
+                 horizon_weeks: int = None) -> None:
         self._manual_days: [Day] = [] if manual_days is None else manual_days
         self._manual_date_work_hours: {dt.date: int} = {day.date: day.work_hours for day in self.manual_days}
+        self._manual_date_intervals: {dt.date: [(int, int)]} = {day.date: day.free_intervals
+                                                                for day in self.manual_days if day.intervals is not None}
         self._dflt_day_work_hours: int = dflt_day_work_hours
         self._dflt_task_work_hours: int = dflt_task_work_hours
         self._start_date: dt.date = start_date
+        self._horizon_weeks: int = horizon_weeks
         self._days: [Day] = []
+        self._interval_days: [Day] = []
+        self._assignments: Assignments = Assignments()
+        self._backlog: {Task: int} = {}
         self._near_fillable_day_index: int = -1
 
         self.init_days(max_date)
@@ -181,6 +541,26 @@ class Calendar:
     def __getitem__(self, index: int) -> Day:
         return self._days[index]
 
+    def __getstate__(self) -> dict:
+        # days are rebuilt from their work hours, the schedule itself lives in assignments
+        state = self.__dict__.copy()
+        state["_days"] = array("l", [day.work_hours for day in self._days])
+        state["_interval_days"] = [(day.index, day.intervals) for day in self._interval_days]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        days_work_hours = state["_days"]
+        interval_days = state["_interval_days"]
+        self.__dict__.update(state)
+        self._days = []
+        self._interval_days = []
+        for work_hours in days_work_hours:
+            self.add_day()
+            self._days[-1].work_hours = work_hours
+        self._interval_days = [self._days[index] for index, _ in interval_days]
+        for index, intervals in interval_days:
+            self._days[index].intervals = intervals
+
     def __len__(self) -> int:
         return len(self._days)
 
@@ -188,6 +568,38 @@ class Calendar:
     def start_date(self) -> dt.date:
         return self._start_date
 
+    @start_date.setter
+    def start_date(self, start_date: dt.date) -> None:
+        max_date = self.last_added_day_date
+        self._start_date = start_date
+        self.init_days(max_date)
+
+    @property
+    def horizon_weeks(self) -> int:
+        return self._horizon_weeks
+
+    @horizon_weeks.setter
+    def horizon_weeks(self, horizon_weeks: int) -> None:
+        self._horizon_weeks = horizon_weeks
+
+    @property
+    def horizon_date(self) -> dt.date:
+        """
+        First date no new day is added for, None when planning is not limited by a rolling horizon.
+        Days already needed for deadlines are kept even after this date.
+        """
+        if self.horizon_weeks is None:
+            return None
+        return self.start_date + dt.timedelta(weeks=self.horizon_weeks)
+
+    @property
+    def backlog(self) -> {Task: int}:
+        return self._backlog
+
+    @property
+    def backlog_hours(self) -> int:
+        return sum(self.backlog.values())
+
     @property
     def near_fillable_day(self) -> Day:
         return self._days[self._near_fillable_day_index]
@@ -216,16 +628,26 @@ class Calendar:
     def manual_days(self, manual_days: [Day]) -> None:
         self._manual_days = manual_days
         self._manual_date_work_hours: {dt.date: int} = {day.date: day.work_hours for day in manual_days}
+        self._manual_date_intervals: {dt.date: [(int, int)]} = {day.date: day.free_intervals
+                                                                for day in manual_days if day.intervals is not None}
         self.init_days()
 
     @property
     def manual_date_work_hours(self) -> {dt.date: int}:
         return self._manual_date_work_hours
 
+    @property
+    def manual_date_intervals(self) -> {dt.date: [(int, int)]}:
+        return self._manual_date_intervals
+
     @property
     def days(self) -> [Day]:
         return self._days
 
+    @property
+    def assignments(self) -> Assignments:
+        return self._assignments
+
     @property
     def last_added_day_date(self) -> dt.date:
         if len(self.days):
@@ -235,29 +657,49 @@ class Calendar:
     def init_days(self, max_date: dt.date = None) -> None:
         max_date = self.start_date if max_date is None else max_date
         self._days: [Day] = []
+        self._interval_days = []
+        self._assignments.clear()
+        self._backlog = {}
         while self.last_added_day_date <= max_date:
             self.add_day()
         self._near_fillable_day_index: int = -1
         self.next_fillable_day()
 
     def clean_calendar(self):
-        for day in self.days:
-            day.clean_schedule()
+        self.assignments.clear()
+        for day in self._interval_days:
+            day.clean_slots()
+        self._backlog = {}
         self._near_fillable_day_index = -1
         self.next_fillable_day()
 
     def add_day(self) -> None:
-        date = self.last_added_day_date + dt.timedelta(days=1)
+        date = self._start_date + dt.timedelta(days=len(self._days))
         work_hours = self.manual_date_work_hours.get(date, self.dflt_day_work_hours)
-        self.days.append(Day(date=date, work_hours=work_hours))
+        free_intervals = self.manual_date_intervals.get(date)
+        day = Day(date=date, work_hours=work_hours, assignments=self.assignments, index=len(self.days),
+                  free_intervals=free_intervals)
+        if free_intervals is not None:
+            self._interval_days.append(day)
+        self.days.append(day)
 
-    def next_fillable_day(self) -> None:
+    def can_add_day(self) -> bool:
+        return self.horizon_date is None or self.last_added_day_date + dt.timedelta(days=1) < self.horizon_date
+
+    def next_fillable_day(self) -> bool:
+        """
+        Moves to the next day with free hours. Returns False, staying on the last day, if the horizon is reached.
+        """
         self._near_fillable_day_index += 1
         while self._near_fillable_day_index >= len(self.days) or self.near_fillable_day.is_task_filled():
             if self._near_fillable_day_index >= len(self.days):
+                if not self.can_add_day():
+                    self._near_fillable_day_index = len(self.days) - 1
+                    return False
                 self.add_day()
             elif self.near_fillable_day.is_task_filled():
                 self._near_fillable_day_index += 1
+        return True
 
     def next_fillable_day_v2(self) -> None:
         """
@@ -282,19 +724,59 @@ class Calendar:
         day = self.near_fillable_day
         while work_hours:
             while day.is_task_filled():
-                self.next_fillable_day()
+                if not self.next_fillable_day():
+                    self.backlog[task] = self.backlog.get(task, 0) + work_hours
+                    return
                 day = self.near_fillable_day
             work_hours = day.add_task(task, work_hours)
 
+    def estimate_finish_date(self) -> dt.date:
+        """
+        Date the backlog would be finished on if worked off right after the last planned day.
+        Counted from work hours only, no Day objects are created. None if there is no backlog or it never ends.
+        """
+        hours = self.backlog_hours
+        if not hours:
+            return None
+        date = self.last_added_day_date
+        later_manual_dates = sorted(manual_date for manual_date in self.manual_date_work_hours if manual_date > date)
+        for manual_date in later_manual_dates:
+            free_days = (manual_date - date).days - 1
+            if free_days * self.dflt_day_work_hours >= hours:
+                break
+            hours -= free_days * self.dflt_day_work_hours + self.manual_date_work_hours[manual_date]
+            date = manual_date
+            if hours <= 0:
+                return date
+        if self.dflt_day_work_hours <= 0:
+            return None
+        return date + dt.timedelta(days=-(-hours // self.dflt_day_work_hours))
+
+    def last_day_index_before_date(self, date: dt.date) -> int:
+        # days go one after another from start_date, so the index follows from the date
+        return min(len(self.days), (date - self.start_date).days) - 1
+
     def add_task_before_date(self, task: Task, work_hours: int, date: dt.date) -> None:
-        day_i = len(self.days) - 1
-        while self.days[day_i].date >= date:
-            day_i -= 1
+        day_i = self.last_day_index_before_date(date)
         while work_hours:
             while self.days[day_i].is_task_filled():
                 day_i -= 1
             work_hours = self.days[day_i].add_task(task, work_hours)
 
+    def schedule_str_rus(self) -> str:
+        result = ""
+        for day in self.days:
+            if day.has_tasks():
+                result += f"{(date_to_normal_str(day.date))} есть {day.work_hours} рабочий/их час/ов:\n"
+                if day.slots:
+                    for start, end, task in sorted(day.slots, key=lambda slot: slot[0]):
+                        result += f'С {start} до {end} делать задачу "{task.name}"\n'
+                else:
+                    for task, work_hours in day.schedule.items():
+                        result += f'Делать задачу "{task.name}" на протяжении {work_hours} часов/а\n'
+                result += "\n"
+        return result
+
     def get_free_hours_before_date(self, left_date: dt.date, right_date: dt.date) -> int:
         result = 0
         while right_date >= self.last_added_day_date:
@@ -315,18 +797,32 @@ class Planner:
     #     "": Planner.points_allocation,
     #     "": Planner.force_procrastinate_allocation,
     # }
+    # recurring tasks are expanded this far ahead when there is no rolling horizon and no later deadline
+    dflt_recurring_weeks: int = 4
+
     def __init__(self, tasks: [Task] = None, manual_days: [Day] = None, start_date: dt.date = dt.date.today(),
-                 dflt_day_work_hours: int = 4, dflt_task_work_hours: int = 2) -> None:
-        self._tasks = list(filter(lambda task: task.deadline is None or task.deadline > start_date,
-                                  tasks)) if tasks is not None else []
+                 dflt_day_work_hours: int = 4, dflt_task_work_hours: int = 2, horizon_weeks: int = None) -> None:
+        tasks = [] if tasks is None else tasks
+        self._recurring_tasks: [RecurringTask] = [task for task in tasks if isinstance(task, RecurringTask)]
+        # occurrences already done or replaced by plain tasks in roll_forward, they are not expanded again
+        self._settled_occurrences: {(RecurringTask, int)} = set()
+        # expanded occurrences are reused by later expansions, so an occurrence keeps its id from day to day
+        self._occurrences: {(RecurringTask, int): TaskOccurrence} = {}
+        self._tasks = list(filter(lambda task: not isinstance(task, RecurringTask) and (
+                task.deadline is None or task.deadline > start_date), tasks))
+        # ids of dropped tasks are not given to new ones
+        self._next_task_id: int = self.assign_task_ids(self._tasks)
         self._deadline_tasks: {Task} = set()
         self._no_deadline_tasks: {Task} = set()
         self.init_filter_tasks()
         max_date = max(map(lambda task: task.deadline, self.deadline_tasks)) if len(self.deadline_tasks) else None
         self._calendar: [Day] = Calendar(manual_days=manual_days, start_date=start_date,
                                          dflt_day_work_hours=dflt_day_work_hours,
-                                         dflt_task_work_hours=dflt_task_work_hours, max_date=max_date)
+                                         dflt_task_work_hours=dflt_task_work_hours, max_date=max_date,
+                                         horizon_weeks=horizon_weeks)
         self._failed_tasks: [Task] = []
+        if self.recurring_tasks:
+            self.expand_recurring_tasks()
 
     @property
     def tasks(self) -> [Task]:
@@ -334,10 +830,43 @@ class Planner:
 
     @tasks.setter
     def tasks(self, tasks: [Task]) -> None:
-        self._tasks = list(
-            filter(lambda task: task.deadline is None or task.deadline > self.calendar.start_date, tasks))
+        """
+        RecurringTask definitions in tasks replace the current ones, occurrences are expanded again from them.
+        """
+        recurring_tasks = [task for task in tasks if isinstance(task, RecurringTask)]
+        if recurring_tasks:
+            self._recurring_tasks = recurring_tasks
+        self._tasks = list(filter(lambda task: not isinstance(task, (RecurringTask, TaskOccurrence)) and (
+                task.deadline is None or task.deadline > self.calendar.start_date), tasks))
+        self._next_task_id = self.assign_task_ids(self._tasks, self._next_task_id)
         self.clean_calendar()
         self.init_filter_tasks()
+        if self.recurring_tasks:
+            self.expand_recurring_tasks()
+
+    @property
+    def recurring_tasks(self) -> [RecurringTask]:
+        return self._recurring_tasks
+
+    @recurring_tasks.setter
+    def recurring_tasks(self, recurring_tasks: [RecurringTask]) -> None:
+        self._recurring_tasks = recurring_tasks
+        self.clean_calendar()
+        self.expand_recurring_tasks()
+
+    @property
+    def recurring_end_date(self) -> dt.date:
+        """
+        Last deadline recurring tasks are expanded up to: the rolling horizon if there is one,
+        otherwise the latest deadline of the other tasks but at least dflt_recurring_weeks ahead.
+        """
+        if self.calendar.horizon_date is not None:
+            return self.calendar.horizon_date
+        end_date = self.calendar.start_date + dt.timedelta(weeks=self.dflt_recurring_weeks)
+        for task in self.deadline_tasks:
+            if not isinstance(task, TaskOccurrence) and task.deadline > end_date:
+                end_date = task.deadline
+        return end_date
 
     @property
     def manual_days(self) -> [Day]:
@@ -347,6 +876,23 @@ class Planner:
     def manual_days(self, manual_days: [Day]) -> None:
         self.calendar.manual_days = manual_days
 
+    @property
+    def start_date(self) -> dt.date:
+        return self.calendar.start_date
+
+    @start_date.setter
+    def start_date(self, start_date: dt.date) -> None:
+        """
+        Moves the plan forward: past days are dropped, the rolling horizon moves with the start date and
+        tasks whose deadline has passed are filtered out. The calendar is cleaned, allocation must be rerun.
+        """
+        self.calendar.start_date = start_date
+        self.tasks = self.tasks
+
+    @property
+    def backlog(self) -> {Task: int}:
+        return self.calendar.backlog
+
     @property
     def deadline_tasks(self) -> {Task}:
         return self._deadline_tasks
@@ -383,6 +929,73 @@ class Planner:
     def failed_tasks(self, tasks: {Task}) -> None:
         self._failed_tasks = tasks
 
+    def expand_recurring_tasks(self) -> None:
+        """
+        Replaces the occurrences in tasks with the ones of recurring_tasks due up to recurring_end_date.
+        """
+        self.init_filter_tasks()
+        end_date = self.recurring_end_date
+        tasks = [task for task in self.tasks if not isinstance(task, TaskOccurrence)]
+        occurrences = {}
+        for recurring_task in self.recurring_tasks:
+            for occurrence in recurring_task.occurrences(self.calendar.start_date, end_date):
+                key = (recurring_task, occurrence.index)
+                if key not in self._settled_occurrences:
+                    occurrences[key] = self._occurrences.get(key, occurrence)
+        self._occurrences = occurrences
+        tasks.extend(occurrences.values())
+        self._tasks = tasks
+        self._next_task_id = self.assign_task_ids(self._tasks, self._next_task_id)
+        self.init_filter_tasks()
+        if len(self.deadline_tasks):
+            max_date = max(task.deadline for task in self.deadline_tasks)
+            while self.calendar.last_added_day_date <= max_date:
+                self.calendar.add_day()
+
+    def roll_forward(self, start_date: dt.date) -> None:
+        """
+        Moves the plan to start_date counting the hours planned before it as done: finished tasks are dropped and
+        partly done ones are replaced by tasks with the remaining hours. The calendar is cleaned, allocation must
+        be rerun.
+        """
+        done_days = (start_date - self.calendar.start_date).days
+        done_hours: {Task: int} = {}
+        for task, day_index, work_hours in self.calendar.assignments:
+            if day_index < done_days:
+                done_hours[task] = done_hours.get(task, 0) + work_hours
+
+        tasks = []
+        for task in self.tasks:
+            task_done_hours = done_hours.get(task, 0)
+            if not task_done_hours:
+                tasks.append(task)
+                continue
+            if isinstance(task, TaskOccurrence):
+                self._settled_occurrences.add((task.template, task.index))
+            if task_done_hours < task.work_hours:
+                tasks.append(Task(task.name, task.deadline, task.interest, task.work_hours - task_done_hours,
+                                  task.importance, task.id))
+        self._settled_occurrences = {(template, index) for template, index in self._settled_occurrences
+                                     if template.get_deadline(index) > start_date}
+        self.calendar.start_date = start_date
+        self.tasks = tasks
+
+    @staticmethod
+    def assign_task_ids(tasks: [Task], next_id: int = 0) -> int:
+        """
+        Makes the ids of the tasks unique: tasks without an id and tasks repeating an id of an earlier task
+        (e.g. tasks taken from several planners) get new ids after the largest id already used by these tasks,
+        but not below next_id. Returns the id to continue from.
+        """
+        next_id = max(next_id, max((task.id for task in tasks if task.id is not None), default=-1) + 1)
+        used_ids: {int: Task} = {}
+        for task in tasks:
+            if task.id is None or used_ids.get(task.id, task) is not task:
+                task.id = next_id
+                next_id += 1
+            used_ids[task.id] = task
+        return next_id
+
     def init_filter_tasks(self) -> None:
         deadline_tasks = set()
         no_deadline_tasks = set()
@@ -400,7 +1013,20 @@ class Planner:
         tasks: [Task] = []
         for args, kwargs in read_args_kwargs(tasks_file_name, task_positional_attr_names):
             kwargs["work_hours"] = kwargs.get("work_hours", dflt_tasks_work_hours)
-            tasks.append(Task(*args, **kwargs))
+            if "every" in kwargs:
+                if "deadline" not in kwargs:
+                    name = args[0] if args else kwargs.get("name")
+                    raise ValueError(f"Recurring task {name!r} in {tasks_file_name} needs a deadline= of the first "
+                                     f"occurrence")
+                kwargs["first_deadline"] = kwargs.pop("deadline")
+                kwargs["interval_days"] = int(kwargs.pop("every"))
+                if "count" in kwargs:
+                    kwargs["count"] = int(kwargs["count"])
+                if "until" in kwargs:
+                    kwargs["until"] = str_to_date(kwargs["until"])
+                tasks.append(RecurringTask(*args, **kwargs))
+            else:
+                tasks.append(Task(*args, **kwargs))
         return tasks
 
     @staticmethod
@@ -409,11 +1035,16 @@ class Planner:
         manual_days: [Day] = []
         for args, kwargs in read_args_kwargs(days_file_name, day_pos_attr_names):
             kwargs["work_hours"] = kwargs.get("work_hours", dflt_days_work_hours)
+            if "free" in kwargs:
+                kwargs["free_intervals"] = str_to_intervals(kwargs.pop("free"))
+            if "blocked" in kwargs:
+                kwargs["blocked_intervals"] = str_to_intervals(kwargs.pop("blocked"))
             manual_days.append(Day(*args, **kwargs))
         return manual_days
 
     def write_result_to_file(self, file_name: str) -> None:
-        result = self.present_tasks_str_rus() + self.failed_tasks_str_rus() + self.calendar_with_schedule_str_rus()
+        result = (self.present_tasks_str_rus() + self.failed_tasks_str_rus() + self.calendar_with_schedule_str_rus() +
+                  self.backlog_str_rus())
 
         with open(file_name, "w", encoding="utf-8") as f:
             f.write(result)
@@ -436,16 +1067,21 @@ class Planner:
             result += "\n"
         return result
 
-    def calendar_with_schedule_str_rus(self) -> str:
-        result = "Календарь с распределёнными задачами:\n"
-        for day in self.calendar:
-            if day.has_tasks():
-                result += f"{(date_to_normal_str(day.date))} есть {day.work_hours} рабочий/их час/ов:\n"
-                for task, work_hours in day.schedule.items():
-                    result += f'Делать задачу "{task.name}" на протяжении {work_hours} часов/а\n'
-                result += "\n"
+    def backlog_str_rus(self) -> str:
+        result = ""
+        if len(self.backlog):
+            result += f"За горизонтом планирования осталось {self.calendar.backlog_hours} час/ов:\n"
+            for task, work_hours in self.backlog.items():
+                result += f'Задача "{task.name}": {work_hours} час/ов\n'
+            finish_date = self.calendar.estimate_finish_date()
+            if finish_date is not None:
+                result += f"Ориентировочная дата завершения: {date_to_normal_str(finish_date)}\n"
+            result += "\n"
         return result
 
+    def calendar_with_schedule_str_rus(self) -> str:
+        return "Календарь с распределёнными задачами:\n" + self.calendar.schedule_str_rus()
+
     def print_calendar_with_schedule(self) -> None:
         for day in self.calendar:
             if day.has_tasks():
@@ -470,11 +1106,11 @@ class Planner:
 
     def can_place_task_before_date(self, work_hours: int, date: dt.date) -> bool:
         sum_hours = 0
-        for day in self.calendar.days[::-1]:
-            if day.date < date:
-                sum_hours += day.free_hours
-                if sum_hours >= work_hours:
-                    return True
+        days = self.calendar.days
+        for day_i in range(self.calendar.last_day_index_before_date(date), -1, -1):
+            sum_hours += days[day_i].free_hours
+            if sum_hours >= work_hours:
+                return True
         return False
 
     def clean_calendar(self) -> None:
@@ -482,12 +1118,7 @@ class Planner:
         self.failed_tasks: {Task} = set()
 
     def validate_allocation(self) -> None:
-        failed_tasks = set()
-        for day in self.calendar:
-            for task, work_hours in day.schedule.items():
-                if task.deadline is not None and day.date >= task.deadline:
-                    failed_tasks.add(task)
-        self.failed_tasks = failed_tasks
+        self.failed_tasks = self.calendar.assignments.late_tasks(self.calendar.start_date)
 
     def allocate_tasks(self, tasks) -> None:
         self.clean_calendar()
@@ -505,28 +1136,40 @@ class Planner:
         sorted_tasks = sorted(self.tasks, key=func, reverse=rev_bool)
         self.allocate_tasks(sorted_tasks)
 
-    def importance_allocation(self) -> None:
-        sorted_deadline_tasks = sorted(self.deadline_tasks,
+    @staticmethod
+    def importance_order(tasks: [Task]) -> [Task]:
+        sorted_deadline_tasks = sorted(filter(Task.has_deadline, tasks),
                                        key=lambda task: (task.importance <= 5, task.deadline, 1 / task.interest))
-        sorted_no_deadline_tasks = sorted(self.no_deadline_tasks,
+        sorted_no_deadline_tasks = sorted(filter(lambda task: not task.has_deadline(), tasks),
                                           key=lambda task: (task.importance * task.interest),
                                           reverse=True)
-        self.allocate_tasks(sorted_deadline_tasks + sorted_no_deadline_tasks)
+        return sorted_deadline_tasks + sorted_no_deadline_tasks
+
+    @staticmethod
+    def interest_order(tasks: [Task]) -> [Task]:
+        return sorted(tasks, key=lambda task: (task.interest, task.importance, task.has_deadline()), reverse=True)
+
+    @staticmethod
+    def interest_importance_order(tasks: [Task]) -> [Task]:
+        return sorted(tasks, key=lambda task: task.interest * task.importance, reverse=True)
+
+    @staticmethod
+    def points_order(tasks: [Task]) -> [Task]:
+        return sorted(tasks,
+                      key=lambda task: (task.importance * task.work_hours, task.interest * task.work_hours),
+                      reverse=True)
+
+    def importance_allocation(self) -> None:
+        self.allocate_tasks(self.importance_order(self.tasks))
 
     def interest_allocation(self) -> None:
-        sorted_tasks = sorted(self.tasks, key=lambda task: (task.interest, task.importance, task.has_deadline()),
-                              reverse=True)
-        self.allocate_tasks(sorted_tasks)
+        self.allocate_tasks(self.interest_order(self.tasks))
 
     def interest_importance_allocation(self) -> None:
-        sorted_tasks = sorted(self.tasks, key=lambda task: task.interest * task.importance, reverse=True)
-        self.allocate_tasks(sorted_tasks)
+        self.allocate_tasks(self.interest_importance_order(self.tasks))
 
     def points_allocation(self) -> None:
-        sorted_tasks = sorted(self.tasks,
-                              key=lambda task: (task.importance * task.work_hours, task.interest * task.work_hours),
-                              reverse=True)
-        self.allocate_tasks(sorted_tasks)
+        self.allocate_tasks(self.points_order(self.tasks))
 
     def force_procrastinate_allocation(self):
         imp_srt = sorted(self._deadline_tasks, key=lambda t: (1 / t.importance, t.deadline, 1 / t.interest))
@@ -543,3 +1186,75 @@ class Planner:
         for task in int_srt:
             self.add_task(task)
         self.failed_tasks = failed_tasks
+
+    def aging_allocation(self, slack_hours: int = None) -> None:
+        """
+        Walks the calendar day by day taking tasks from a priority queue ordered by importance * interest.
+        A deadline task is promoted ahead of the others (earliest deadline first) once its slack, the work hours of
+        the days left before its deadline minus its remaining hours, drops to slack_hours. Tasks can be split
+        across days. A task still unfinished on its deadline is added to failed_tasks with the hours it already got.
+        """
+        slack_hours = self.dflt_day_work_hours if slack_hours is None else slack_hours
+        self.clean_calendar()
+        start_date = self.calendar.start_date
+        days = self.calendar.days
+        if len(self.deadline_tasks):
+            while self.calendar.last_added_day_date < max(task.deadline for task in self.deadline_tasks):
+                self.calendar.add_day()
+        hours_prefix = list(accumulate((day.work_hours for day in days), initial=0))
+        remaining_hours = {task: task.work_hours for task in self.tasks}
+
+        def promotion_day_index(task: Task) -> int:
+            deadline_index = (task.deadline - start_date).days
+            return bisect_left(hours_prefix, hours_prefix[deadline_index] - remaining_hours[task] - slack_hours)
+
+        failed_tasks = set()
+        promoted_tasks = set()
+        ready_heap, urgent_heap, waiting_heap = [], [], []
+        # ties are broken by the position in tasks, so heap entries never compare the tasks themselves
+        for task_order, task in enumerate(self.tasks):
+            if task.deadline is not None:
+                if hours_prefix[(task.deadline - start_date).days] < task.work_hours:
+                    failed_tasks.add(task)
+                    continue
+                heappush(waiting_heap, (promotion_day_index(task), task_order, task))
+            heappush(ready_heap, ((-task.importance * task.interest, -task.importance, task_order), task))
+
+        day_index = 0
+        while ready_heap or urgent_heap:
+            if day_index >= len(days):
+                if not self.calendar.can_add_day():
+                    for _, task in ready_heap + urgent_heap:
+                        if not remaining_hours[task] or task in failed_tasks or task in self.backlog:
+                            continue
+                        if task.deadline is None:
+                            self.backlog[task] = remaining_hours[task]
+                        else:
+                            failed_tasks.add(task)
+                    break
+                self.calendar.add_day()
+            day = days[day_index]
+            while waiting_heap and waiting_heap[0][0] <= day_index:
+                _, task_order, task = heappop(waiting_heap)
+                if not remaining_hours[task] or task in failed_tasks:
+                    continue
+                promotion_index = promotion_day_index(task)
+                if promotion_index > day_index:
+                    heappush(waiting_heap, (promotion_index, task_order, task))
+                    continue
+                promoted_tasks.add(task)
+                heappush(urgent_heap, ((task.deadline, -task.importance, task_order), task))
+
+            while not day.is_task_filled() and (ready_heap or urgent_heap):
+                heap = urgent_heap if urgent_heap else ready_heap
+                key, task = heappop(heap)
+                if not remaining_hours[task] or task in failed_tasks or (heap is ready_heap and task in promoted_tasks):
+                    continue
+                if task.deadline is not None and day.date >= task.deadline:
+                    failed_tasks.add(task)
+                    continue
+                remaining_hours[task] = day.add_task(task, remaining_hours[task])
+                if remaining_hours[task]:
+                    heappush(heap, (key, task))
+            day_index += 1
+        self.failed_tasks = failed_tasks
@@ -0,0 +1,99 @@
+import csv
+import datetime as dt
+import json
+import os
+
+from .classes import Task, Calendar
+
+ICS_PRODID = "-//task-scheduler-bot//planner//RU"
+
+
+def iter_task_runs(calendar: Calendar):
+    """
+    Yields (task, first date, last date, work hours) for every run of consecutive days carrying the same task.
+    Only the runs still open on the previous day are kept, so memory does not grow with the calendar length.
+    """
+    open_runs: {Task: [dt.date, dt.date, int]} = {}
+    for day in calendar.days:
+        schedule = day.schedule
+        for task in [task for task in open_runs if task not in schedule]:
+            first_date, last_date, work_hours = open_runs.pop(task)
+            yield task, first_date, last_date, work_hours
+        for task, work_hours in schedule.items():
+            run = open_runs.get(task)
+            if run is None:
+                open_runs[task] = [day.date, day.date, work_hours]
+            else:
+                run[1] = day.date
+                run[2] += work_hours
+    for task, (first_date, last_date, work_hours) in open_runs.items():
+        yield task, first_date, last_date, work_hours
+
+
+def write_csv(calendar: Calendar, file_name: str) -> None:
+    with open(file_name, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["task_id", "name", "start_date", "end_date", "work_hours"])
+        for task, first_date, last_date, work_hours in iter_task_runs(calendar):
+            writer.writerow([task.id, task.name, first_date.isoformat(), last_date.isoformat(), work_hours])
+
+
+def write_jsonl(calendar: Calendar, file_name: str) -> None:
+    with open(file_name, "w", encoding="utf-8") as f:
+        for task, first_date, last_date, work_hours in iter_task_runs(calendar):
+            record = {"task_id": task.id, "name": task.name, "start_date": first_date.isoformat(),
+                      "end_date": last_date.isoformat(), "work_hours": work_hours,
+                      "deadline": task.deadline.isoformat() if task.deadline else None}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def escape_ics_text(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def fold_ics_line(line: str) -> str:
+    """
+    Splits a content line into chunks of at most 75 octets as RFC 5545 requires.
+    """
+    chunks = []
+    chunk = ""
+    chunk_size = 0
+    for char in line:
+        char_size = len(char.encode("utf-8"))
+        if chunk_size + char_size > (75 if not chunks else 74):
+            chunks.append(chunk)
+            chunk, chunk_size = "", 0
+        chunk += char
+        chunk_size += char_size
+    chunks.append(chunk)
+    return "\r\n ".join(chunks) + "\r\n"
+
+
+def write_ics(calendar: Calendar, file_name: str) -> None:
+    stamp = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    with open(file_name, "w", encoding="utf-8", newline="") as f:
+        f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n" + fold_ics_line(f"PRODID:{ICS_PRODID}"))
+        for task, first_date, last_date, work_hours in iter_task_runs(calendar):
+            f.write("BEGIN:VEVENT\r\n")
+            f.write(fold_ics_line(f"UID:{task.id}-{first_date:%Y%m%d}@task-scheduler-bot"))
+            f.write(f"DTSTAMP:{stamp}\r\n")
+            f.write(f"DTSTART;VALUE=DATE:{first_date:%Y%m%d}\r\n")
+            f.write(f"DTEND;VALUE=DATE:{last_date + dt.timedelta(days=1):%Y%m%d}\r\n")
+            f.write(fold_ics_line(f"SUMMARY:{escape_ics_text(task.name)}"))
+            f.write(fold_ics_line(f"DESCRIPTION:{escape_ics_text(f'Рабочих часов: {work_hours}')}"))
+            f.write("END:VEVENT\r\n")
+        f.write("END:VCALENDAR\r\n")
+
+
+EXPORT_WRITERS = {
+    ".csv": write_csv,
+    ".jsonl": write_jsonl,
+    ".ics": write_ics,
+}
+
+
+def export_calendar(calendar: Calendar, file_name: str) -> None:
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension not in EXPORT_WRITERS:
+        raise ValueError(f"Unsupported export format {extension!r}, expected one of {', '.join(EXPORT_WRITERS)}")
+    EXPORT_WRITERS[extension](calendar, file_name)
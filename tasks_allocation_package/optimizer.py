@@ -0,0 +1,223 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .classes import Planner
+
+
+class LocalSearchOptimizer:
+    """
+    Improves an existing allocation of a planner by simulated annealing over moves and swaps of task hours
+    between days. Restarts run independently in worker processes and the best schedule found within
+    time_budget seconds of wall-clock time is written back into the planner.
+
+    The objective rewards every fully scheduled task with importance * work_hours * horizon and charges
+    importance * interest / 100 for each hour per day of delay, so finishing tasks always outweighs timing.
+    """
+
+    def __init__(self, planner: Planner, time_budget: float = 5.0, restarts: int = None, processes: int = None,
+                 seed: int = None, start_temperature: float = None) -> None:
+        self._planner: Planner = planner
+        self._time_budget: float = time_budget
+        self._processes: int = (os.cpu_count() or 1) if processes is None else processes
+        self._restarts: int = self._processes if restarts is None else restarts
+        self._seed: int = random.randrange(2 ** 32) if seed is None else seed
+        self._start_temperature: float = start_temperature
+        self._best_objective: float = None
+        self._trace: [[(float, float)]] = []
+
+    @property
+    def planner(self) -> Planner:
+        return self._planner
+
+    @property
+    def best_objective(self) -> float:
+        return self._best_objective
+
+    @property
+    def trace(self) -> [[(float, float)]]:
+        """
+        For every restart, (seconds since start, best objective) pairs recorded at each improvement.
+        """
+        return self._trace
+
+    def build_problem(self) -> ([int], [(int, int, int, int)], [(int, int, int)]):
+        calendar = self.planner.calendar
+        horizon = len(calendar)
+        tasks = self.planner.tasks
+        task_indexes = {task: i for i, task in enumerate(tasks)}
+        capacities = [day.work_hours for day in calendar]
+        task_params = [(horizon if task.deadline is None else min((task.deadline - calendar.start_date).days, horizon),
+                        task.work_hours, task.importance, task.interest) for task in tasks]
+        rows = [(task_indexes[task], day_i, hours) for task, day_i, hours in calendar.assignments
+                if task in task_indexes and hours]
+        return capacities, task_params, rows
+
+    def optimize(self) -> float:
+        capacities, task_params, rows = self.build_problem()
+        end_time = time.time() + self._time_budget
+        seeds = [self._seed + i for i in range(self._restarts)]
+        # restarts run in waves of as many restarts as there are processes, each wave gets its share of the budget
+        wave_size = min(self._processes, self._restarts) if self._processes > 1 else 1
+        waves = [seeds[i:i + wave_size] for i in range(0, len(seeds), wave_size)]
+        results = []
+        executor = ProcessPoolExecutor(max_workers=wave_size) if wave_size > 1 else None
+        try:
+            for i, wave_seeds in enumerate(waves):
+                wave_end_time = time.time() + (end_time - time.time()) / (len(waves) - i)
+                args = [(capacities, task_params, rows, wave_end_time, seed, self._start_temperature)
+                        for seed in wave_seeds]
+                if executor is None:
+                    results.extend(run_annealing(*restart_args) for restart_args in args)
+                else:
+                    results.extend(executor.map(run_annealing, *zip(*args)))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        best_objective, best_rows, _ = max(results, key=lambda result: result[0])
+        self._best_objective = best_objective
+        self._trace = [trace for _, _, trace in results]
+        self.apply_rows(best_rows)
+        return best_objective
+
+    def apply_rows(self, rows: [(int, int, int)]) -> None:
+        tasks = self.planner.tasks
+        days = self.planner.calendar.days
+        self.planner.clean_calendar()
+        scheduled_hours = [0] * len(tasks)
+        for task_i, day_i, hours in rows:
+            days[day_i].add_task(tasks[task_i], hours)
+            scheduled_hours[task_i] += hours
+        self.planner.failed_tasks = {task for task, hours in zip(tasks, scheduled_hours) if hours < task.work_hours}
+
+
+def get_objective(task_params: [(int, int, int, int)], horizon: int, task_hours: [{int: int}]) -> float:
+    return sum(task_objective(params, horizon, hours) for params, hours in zip(task_params, task_hours))
+
+
+def task_objective(params: (int, int, int, int), horizon: int, hours: {int: int}) -> float:
+    deadline_index, work_hours, importance, interest = params
+    delay = sum(day_i * day_hours for day_i, day_hours in hours.items()) * importance * interest / 100
+    completion = importance * work_hours * horizon if sum(hours.values()) == work_hours else 0
+    return completion - delay
+
+
+def run_annealing(capacities: [int], task_params: [(int, int, int, int)], rows: [(int, int, int)], end_time: float,
+                  seed: int, start_temperature: float = None) -> (float, [(int, int, int)], [(float, float)]):
+    """
+    One simulated annealing restart. Runs until end_time (time.time() based, so it is shared across processes)
+    and returns the best objective, its rows (task index, day index, hours) and the improvement trace.
+    """
+    rng = random.Random(seed)
+    horizon = len(capacities)
+    task_count = len(task_params)
+    task_hours = [{} for _ in range(task_count)]
+    used_hours = [0] * horizon
+    for task_i, day_i, hours in rows:
+        task_hours[task_i][day_i] = task_hours[task_i].get(day_i, 0) + hours
+        used_hours[day_i] += hours
+    if not task_count or not horizon:
+        return get_objective(task_params, horizon, task_hours), rows, []
+
+    objective = get_objective(task_params, horizon, task_hours)
+    # the best schedule is copied only when the search is about to leave it
+    best_objective, best_task_hours, best_is_current = objective, None, True
+    if start_temperature is None:
+        start_temperature = max(1.0, sum(params[1] * params[2] for params in task_params) * horizon / task_count / 10)
+    end_temperature = start_temperature / 1000
+    start_time = time.time()
+    total_time = max(end_time - start_time, 1e-9)
+    temperature = start_temperature
+    trace = [(0.0, best_objective)]
+
+    iteration = 0
+    while True:
+        iteration += 1
+        if iteration % 256 == 0:
+            now = time.time()
+            if now >= end_time:
+                break
+            temperature = start_temperature * (end_temperature / start_temperature) ** ((now - start_time) / total_time)
+
+        task_i = rng.randrange(task_count)
+        hours = task_hours[task_i]
+        params = task_params[task_i]
+        move = rng.random()
+        changes = None
+        if move < 0.1:
+            # insert the missing hours of the task into the earliest free days before its deadline
+            missing = params[1] - sum(hours.values())
+            if not missing:
+                continue
+            changes = []
+            for day_i in range(params[0]):
+                free = capacities[day_i] - used_hours[day_i]
+                if free:
+                    changes.append((task_i, day_i, min(free, missing)))
+                    missing -= changes[-1][2]
+                    if not missing:
+                        break
+            if missing:
+                continue
+        elif move < 0.15:
+            if not hours:
+                continue
+            changes = [(task_i, day_i, -day_hours) for day_i, day_hours in hours.items()]
+        elif move < 0.6:
+            if not hours:
+                continue
+            from_day = rng.choice(list(hours))
+            to_day = rng.randrange(params[0]) if params[0] else from_day
+            free = capacities[to_day] - used_hours[to_day]
+            if to_day == from_day or not free:
+                continue
+            moved = rng.randint(1, min(hours[from_day], free))
+            changes = [(task_i, from_day, -moved), (task_i, to_day, moved)]
+        else:
+            other_i = rng.randrange(task_count)
+            other_hours = task_hours[other_i]
+            if other_i == task_i or not hours or not other_hours:
+                continue
+            day_a = rng.choice(list(hours))
+            day_b = rng.choice(list(other_hours))
+            if day_a == day_b or day_b >= params[0] or day_a >= task_params[other_i][0]:
+                continue
+            moved = rng.randint(1, min(hours[day_a], other_hours[day_b]))
+            changes = [(task_i, day_a, -moved), (task_i, day_b, moved),
+                       (other_i, day_b, -moved), (other_i, day_a, moved)]
+
+        touched = {change[0] for change in changes}
+        before = sum(task_objective(task_params[i], horizon, task_hours[i]) for i in touched)
+        apply_changes(task_hours, used_hours, changes)
+        delta = sum(task_objective(task_params[i], horizon, task_hours[i]) for i in touched) - before
+        if delta >= 0 or rng.random() < math.exp(delta / temperature):
+            if delta < 0 and best_is_current:
+                reverted = [(i, day_i, -diff) for i, day_i, diff in changes]
+                apply_changes(task_hours, used_hours, reverted)
+                best_task_hours, best_is_current = [dict(hours) for hours in task_hours], False
+                apply_changes(task_hours, used_hours, changes)
+            objective += delta
+            if objective > best_objective:
+                best_objective, best_is_current = objective, True
+                trace.append((time.time() - start_time, best_objective))
+        else:
+            apply_changes(task_hours, used_hours, [(i, day_i, -diff) for i, day_i, diff in changes])
+
+    if best_is_current:
+        best_task_hours = task_hours
+    best_rows = [(task_i, day_i, day_hours) for task_i, hours in enumerate(best_task_hours)
+                 for day_i, day_hours in sorted(hours.items())]
+    return best_objective, best_rows, trace
+
+
+def apply_changes(task_hours: [{int: int}], used_hours: [int], changes: [(int, int, int)]) -> None:
+    for task_i, day_i, diff in changes:
+        day_hours = task_hours[task_i].get(day_i, 0) + diff
+        if day_hours:
+            task_hours[task_i][day_i] = day_hours
+        else:
+            task_hours[task_i].pop(day_i, None)
+        used_hours[day_i] += diff
@@ -0,0 +1,157 @@
+"""
+Frozen reference of the Planner allocation strategies with the original per-day {Task: int} schedules.
+It is kept as simple as possible and must not be optimized: faster engines are checked against it
+by fuzz_allocations.py. Only change it together with an intended change of allocation results.
+"""
+import datetime as dt
+
+from .classes import Task, Day
+
+
+class ReferenceDay:
+    def __init__(self, date: dt.date, work_hours: int) -> None:
+        self.date: dt.date = date
+        self.work_hours: int = work_hours
+        self.schedule: {Task: int} = {}
+
+    @property
+    def sum_hours(self) -> int:
+        return sum(self.schedule.values())
+
+    @property
+    def free_hours(self) -> int:
+        return self.work_hours - self.sum_hours
+
+    def add_task(self, task: Task, work_hours: int) -> int:
+        if self.sum_hours + work_hours <= self.work_hours:
+            add_work_hours = work_hours
+        else:
+            add_work_hours = self.work_hours - self.sum_hours
+        self.schedule[task] = self.schedule.get(task, 0) + add_work_hours
+        return work_hours - add_work_hours
+
+    def is_task_filled(self) -> bool:
+        return self.work_hours == self.sum_hours
+
+
+class ReferenceCalendar:
+    def __init__(self, manual_days: [Day], start_date: dt.date, dflt_day_work_hours: int, max_date: dt.date) -> None:
+        self.manual_date_work_hours: {dt.date: int} = {day.date: day.work_hours for day in manual_days}
+        self.dflt_day_work_hours: int = dflt_day_work_hours
+        self.start_date: dt.date = start_date
+        self.days: [ReferenceDay] = []
+        max_date = start_date if max_date is None else max_date
+        while self.last_added_day_date <= max_date:
+            self.add_day()
+        self.near_fillable_day_index: int = -1
+        self.next_fillable_day()
+
+    @property
+    def last_added_day_date(self) -> dt.date:
+        if len(self.days):
+            return self.days[-1].date
+        return self.start_date - dt.timedelta(days=1)
+
+    @property
+    def near_fillable_day(self) -> ReferenceDay:
+        return self.days[self.near_fillable_day_index]
+
+    def clean_calendar(self) -> None:
+        for day in self.days:
+            day.schedule = {}
+        self.near_fillable_day_index = -1
+        self.next_fillable_day()
+
+    def add_day(self) -> None:
+        date = self.last_added_day_date + dt.timedelta(days=1)
+        self.days.append(ReferenceDay(date, self.manual_date_work_hours.get(date, self.dflt_day_work_hours)))
+
+    def next_fillable_day(self) -> None:
+        self.near_fillable_day_index += 1
+        while self.near_fillable_day_index >= len(self.days) or self.near_fillable_day.is_task_filled():
+            if self.near_fillable_day_index >= len(self.days):
+                self.add_day()
+            else:
+                self.near_fillable_day_index += 1
+
+    def add_task(self, task: Task, work_hours: int) -> None:
+        day = self.near_fillable_day
+        while work_hours:
+            while day.is_task_filled():
+                self.next_fillable_day()
+                day = self.near_fillable_day
+            work_hours = day.add_task(task, work_hours)
+
+    def add_task_before_date(self, task: Task, work_hours: int, date: dt.date) -> None:
+        day_i = len(self.days) - 1
+        while self.days[day_i].date >= date:
+            day_i -= 1
+        while work_hours:
+            while self.days[day_i].is_task_filled():
+                day_i -= 1
+            work_hours = self.days[day_i].add_task(task, work_hours)
+
+
+class ReferencePlanner:
+    def __init__(self, tasks: [Task], manual_days: [Day], start_date: dt.date, dflt_day_work_hours: int = 4) -> None:
+        self.tasks: [Task] = [task for task in tasks if task.deadline is None or task.deadline > start_date]
+        self.deadline_tasks: {Task} = set()
+        self.no_deadline_tasks: {Task} = set()
+        for task in self.tasks:
+            if task.deadline:
+                self.deadline_tasks.add(task)
+            else:
+                self.no_deadline_tasks.add(task)
+        max_date = max(task.deadline for task in self.deadline_tasks) if self.deadline_tasks else None
+        self.calendar: ReferenceCalendar = ReferenceCalendar(manual_days, start_date, dflt_day_work_hours, max_date)
+        self.failed_tasks: {Task} = set()
+
+    def can_place_task_before_date(self, work_hours: int, date: dt.date) -> bool:
+        sum_hours = 0
+        for day in self.calendar.days[::-1]:
+            if day.date < date:
+                sum_hours += day.free_hours
+                if sum_hours >= work_hours:
+                    return True
+        return False
+
+    def allocate_tasks(self, tasks: [Task]) -> None:
+        self.calendar.clean_calendar()
+        self.failed_tasks = set()
+        for task in tasks:
+            if task.deadline and task.deadline > self.calendar.start_date and self.can_place_task_before_date(
+                    task.work_hours, task.deadline):
+                self.calendar.add_task(task, task.work_hours)
+            else:
+                self.failed_tasks.add(task)
+
+    def importance_allocation(self) -> None:
+        sorted_deadline_tasks = sorted([task for task in self.tasks if task.deadline],
+                                       key=lambda task: (task.importance <= 5, task.deadline, 1 / task.interest))
+        sorted_no_deadline_tasks = sorted([task for task in self.tasks if not task.deadline],
+                                          key=lambda task: (task.importance * task.interest), reverse=True)
+        self.allocate_tasks(sorted_deadline_tasks + sorted_no_deadline_tasks)
+
+    def interest_allocation(self) -> None:
+        self.allocate_tasks(sorted(self.tasks, key=lambda task: (task.interest, task.importance, task.has_deadline()),
+                                   reverse=True))
+
+    def interest_importance_allocation(self) -> None:
+        self.allocate_tasks(sorted(self.tasks, key=lambda task: task.interest * task.importance, reverse=True))
+
+    def points_allocation(self) -> None:
+        self.allocate_tasks(sorted(self.tasks, key=lambda task: (task.importance * task.work_hours,
+                                                                 task.interest * task.work_hours), reverse=True))
+
+    def force_procrastinate_allocation(self) -> None:
+        imp_srt = sorted(self.deadline_tasks, key=lambda t: (1 / t.importance, t.deadline, 1 / t.interest))
+        int_srt = sorted(self.no_deadline_tasks, key=lambda t: (t.interest, t.importance), reverse=True)
+        self.calendar.clean_calendar()
+        self.failed_tasks = set()
+        for task in imp_srt:
+            if self.can_place_task_before_date(task.work_hours, task.deadline):
+                self.calendar.add_task_before_date(task, task.work_hours, task.deadline)
+            else:
+                self.failed_tasks.add(task)
+        for task in int_srt:
+            self.calendar.add_task(task, task.work_hours)
@@ -0,0 +1,56 @@
+import datetime as dt
+import time
+
+from .classes import Planner
+from .utils import date_to_normal_str
+
+DFLT_ALLOCATION = "importance_allocation"
+
+
+def shard(items: [], batch_size: int) -> [[]]:
+    return [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+
+def is_plan_stale(planner: Planner, today: dt.date) -> bool:
+    return planner.start_date < today
+
+
+def replan(planner: Planner, start_date: dt.date, allocation: str = DFLT_ALLOCATION) -> Planner:
+    planner.roll_forward(start_date)
+    getattr(planner, allocation)()
+    return planner
+
+
+def replan_batch(batch: [(int, Planner, str)], start_date: dt.date) -> ([(int, Planner, str)], [(int, str)], float):
+    """
+    Worker entry point: rolls every planner of the batch forward to start_date, reallocates it with its
+    allocation and returns (user id, planner, update text) triples, (user id, error) pairs of the planners
+    that failed and the time the batch took. A failed planner does not stop the others.
+    """
+    batch_start = time.perf_counter()
+    result = []
+    failures = []
+    for user_id, planner, allocation in batch:
+        try:
+            replan(planner, start_date, allocation)
+            result.append((user_id, planner, get_update_str_rus(planner)))
+        except Exception as e:
+            failures.append((user_id, repr(e)))
+    return result, failures, time.perf_counter() - batch_start
+
+
+def get_update_str_rus(planner: Planner) -> str:
+    """
+    Short message about the new day: what to do today and how many tasks no longer fit.
+    """
+    day = planner.calendar[0]
+    result = f"Расписание обновлено, {date_to_normal_str(day.date)}:\n"
+    schedule = day.schedule
+    if schedule:
+        for task, work_hours in schedule.items():
+            result += f'"{task.name}" - {work_hours} ч.\n'
+    else:
+        result += "Сегодня задач нет\n"
+    if len(planner.failed_tasks):
+        result += f"Не помещаются до дедлайна: {len(planner.failed_tasks)}\n"
+    return result
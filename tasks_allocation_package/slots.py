@@ -0,0 +1,195 @@
+from bisect import bisect_left, bisect_right, insort
+
+
+class FreeIntervals:
+    """
+    Free time of one day as disjoint [start, end) hour intervals, hours start at 0. Starts are kept sorted for
+    lookups by time and (length, start) pairs are kept sorted for best-fit lookups. For first-fit lookups a max
+    tree over the hours holds the length of the interval starting at every hour, so "the earliest interval at
+    least h long" is found in O(log n) as well. Work placed into the intervals is remembered as (start, end, task)
+    slots. The free and blocked periods given to the day are remembered too, so reset rebuilds the free time
+    from them and a period blocked after a slot was placed stays blocked.
+    """
+
+    def __init__(self, intervals: [(int, int)] = ()) -> None:
+        self._starts: [int] = []
+        self._ends: {int: int} = {}
+        self._by_length: [(int, int)] = []
+        self._tree_size: int = 1
+        self._max_lengths: [int] = [0, 0]
+        self._free_hours: int = 0
+        self._slots: [(int, int, object)] = []
+        self._changes: [(bool, int, int)] = []
+        for start, end in intervals:
+            self.add_free(start, end)
+
+    def __repr__(self) -> str:
+        return f"FreeIntervals(intervals={self.intervals}, slots={self.slots})"
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    @property
+    def intervals(self) -> [(int, int)]:
+        return [(start, self._ends[start]) for start in self._starts]
+
+    @property
+    def free_hours(self) -> int:
+        return self._free_hours
+
+    @property
+    def slots(self) -> [(int, int, object)]:
+        return self._slots
+
+    def set_max_length(self, start: int, length: int) -> None:
+        if start >= self._tree_size:
+            while start >= self._tree_size:
+                self._tree_size *= 2
+            self._max_lengths = [0] * (2 * self._tree_size)
+            for interval_start, interval_end in self._ends.items():
+                self._max_lengths[self._tree_size + interval_start] = interval_end - interval_start
+            for node in range(self._tree_size - 1, 0, -1):
+                self._max_lengths[node] = max(self._max_lengths[2 * node], self._max_lengths[2 * node + 1])
+        node = self._tree_size + start
+        self._max_lengths[node] = length
+        node //= 2
+        while node:
+            self._max_lengths[node] = max(self._max_lengths[2 * node], self._max_lengths[2 * node + 1])
+            node //= 2
+
+    def insert_interval(self, start: int, end: int) -> None:
+        if start < 0:
+            raise ValueError(f"Free interval ({start}, {end}) starts before hour 0")
+        insort(self._starts, start)
+        self._ends[start] = end
+        insort(self._by_length, (end - start, start))
+        self.set_max_length(start, end - start)
+        self._free_hours += end - start
+
+    def remove_interval(self, start: int) -> int:
+        end = self._ends.pop(start)
+        del self._starts[bisect_left(self._starts, start)]
+        del self._by_length[bisect_left(self._by_length, (end - start, start))]
+        self.set_max_length(start, 0)
+        self._free_hours -= end - start
+        return end
+
+    @property
+    def capacity_hours(self) -> int:
+        """
+        Free hours with no slots placed.
+        """
+        intervals = FreeIntervals()
+        intervals.apply_changes(self._changes)
+        return intervals.free_hours
+
+    def apply_changes(self, changes: [(bool, int, int)]) -> None:
+        for is_free, start, end in changes:
+            if is_free:
+                self.release(start, end)
+            else:
+                self.take(start, end)
+
+    def add_free(self, start: int, end: int) -> None:
+        """
+        Marks [start, end) as free, merging it with the intervals it overlaps or touches.
+        """
+        self._changes.append((True, start, end))
+        self.release(start, end)
+
+    def block(self, start: int, end: int) -> int:
+        """
+        Removes [start, end) from the free time, also for the slots placed after the next reset.
+        Returns the number of hours the free time with no slots placed lost.
+        """
+        capacity_hours = self.capacity_hours
+        self._changes.append((False, start, end))
+        self.take(start, end)
+        return capacity_hours - self.capacity_hours
+
+    def release(self, start: int, end: int) -> None:
+        if start >= end:
+            return
+        i = bisect_left(self._starts, start)
+        if i and self._ends[self._starts[i - 1]] >= start:
+            i -= 1
+        while i < len(self._starts) and self._starts[i] <= end:
+            interval_start = self._starts[i]
+            interval_end = self.remove_interval(interval_start)
+            start, end = min(start, interval_start), max(end, interval_end)
+        self.insert_interval(start, end)
+
+    def take(self, start: int, end: int) -> int:
+        """
+        Removes [start, end) from the current free time and returns the number of free hours it took.
+        """
+        if start >= end:
+            return 0
+        blocked_hours = 0
+        i = bisect_right(self._starts, start) - 1
+        if i < 0 or self._ends[self._starts[i]] <= start:
+            i += 1
+        while i < len(self._starts) and self._starts[i] < end:
+            interval_start = self._starts[i]
+            interval_end = self.remove_interval(interval_start)
+            blocked_hours += min(end, interval_end) - max(start, interval_start)
+            if interval_start < start:
+                self.insert_interval(interval_start, start)
+                i += 1
+            if interval_end > end:
+                self.insert_interval(end, interval_end)
+        return blocked_hours
+
+    def first_fit(self, hours: int) -> int:
+        """
+        Start of the earliest interval at least hours long, or None.
+        """
+        hours = max(hours, 1)
+        if self._max_lengths[1] < hours:
+            return None
+        node = 1
+        while node < self._tree_size:
+            node = 2 * node if self._max_lengths[2 * node] >= hours else 2 * node + 1
+        return node - self._tree_size
+
+    def best_fit(self, hours: int) -> int:
+        """
+        Start of the shortest interval at least hours long, or None.
+        """
+        i = bisect_left(self._by_length, (hours, float("-inf")))
+        if i == len(self._by_length):
+            return None
+        return self._by_length[i][1]
+
+    def place(self, task, hours: int, best_fit: bool = False) -> (int, int):
+        """
+        Places hours of the task as one contiguous slot, returns the slot or None if no interval is long enough.
+        """
+        start = self.best_fit(hours) if best_fit else self.first_fit(hours)
+        if start is None:
+            return None
+        self.take(start, start + hours)
+        self._slots.append((start, start + hours, task))
+        return start, start + hours
+
+    def fill(self, task, hours: int) -> int:
+        """
+        Places hours of the task into the earliest free intervals, splitting it if needed.
+        Returns the hours that did not fit.
+        """
+        while hours and self._starts:
+            start = self._starts[0]
+            slot_hours = min(hours, self._ends[start] - start)
+            self.take(start, start + slot_hours)
+            self._slots.append((start, start + slot_hours, task))
+            hours -= slot_hours
+        return hours
+
+    def reset(self) -> None:
+        """
+        Removes the placed slots, rebuilding the free time from the free and blocked periods.
+        """
+        changes = self._changes
+        self.__init__()
+        self._changes = changes
+        self.apply_changes(changes)
@@ -0,0 +1,52 @@
+import os
+import pickle
+
+from .classes import Planner
+
+
+def get_planner_params(planner: Planner) -> dict:
+    """
+    Planner arguments that are not read from the source files, a snapshot built with other ones is stale.
+    """
+    return {"start_date": planner.start_date, "dflt_day_work_hours": planner.dflt_day_work_hours,
+            "dflt_task_work_hours": planner.dflt_task_work_hours, "horizon_weeks": planner.calendar.horizon_weeks}
+
+
+def save_planner(planner: Planner, file_name: str) -> None:
+    # the parameters go first, so freshness is checked without unpickling the whole planner
+    with open(file_name, "wb") as f:
+        pickle.dump(get_planner_params(planner), f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(planner, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_planner_params(file_name: str) -> dict:
+    with open(file_name, "rb") as f:
+        return pickle.load(f)
+
+
+def load_planner(file_name: str) -> Planner:
+    with open(file_name, "rb") as f:
+        pickle.load(f)
+        return pickle.load(f)
+
+
+def is_snapshot_fresh(snapshot_file_name: str, *source_file_names: str, params: dict = None) -> bool:
+    """
+    True if the snapshot exists, is newer than every source file it was built from and, if params are given,
+    was built with the same planner parameters (see get_planner_params).
+    """
+    if not os.path.exists(snapshot_file_name):
+        return False
+    snapshot_mtime = os.path.getmtime(snapshot_file_name)
+    if not all(os.path.getmtime(file_name) <= snapshot_mtime for file_name in source_file_names):
+        return False
+    if params is None:
+        return True
+    try:
+        snapshot_params = load_planner_params(snapshot_file_name)
+    except (pickle.UnpicklingError, EOFError):
+        return False
+    # snapshots of older versions start with the planner itself
+    if not isinstance(snapshot_params, dict):
+        return False
+    return all(snapshot_params.get(name) == value for name, value in params.items())
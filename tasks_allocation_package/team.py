@@ -0,0 +1,161 @@
+import datetime as dt
+from heapq import heapify, heappush, heappop
+
+from .classes import Task, Day, Calendar, Planner
+from .utils import date_to_normal_str
+
+
+class Worker:
+    def __init__(self, name: str, manual_days: [Day] = None, start_date: dt.date = dt.date.today(),
+                 dflt_day_work_hours: int = 4) -> None:
+        self._name: str = name
+        self._calendar: Calendar = Calendar(manual_days=manual_days, start_date=start_date,
+                                            dflt_day_work_hours=dflt_day_work_hours)
+        self._tasks: [Task] = []
+
+    def __repr__(self) -> str:
+        return f"Worker(name={self.name}, tasks={len(self.tasks)}, work_hours={self.work_hours})"
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def calendar(self) -> Calendar:
+        return self._calendar
+
+    @property
+    def tasks(self) -> [Task]:
+        return self._tasks
+
+    @property
+    def work_hours(self) -> int:
+        return sum(task.work_hours for task in self.tasks)
+
+    @property
+    def near_fillable_day_index(self) -> int:
+        return (self.calendar.near_fillable_day.date - self.calendar.start_date).days
+
+    def clean(self) -> None:
+        self.calendar.clean_calendar()
+        self._tasks = []
+
+    def get_free_hours_before_date(self, date: dt.date) -> int:
+        """
+        Free hours from the near fillable day up to date. The calendar is only filled forward,
+        so earlier days have no free hours left.
+        """
+        while self.calendar.last_added_day_date < date:
+            self.calendar.add_day()
+        deadline_index = (date - self.calendar.start_date).days
+        return sum(day.free_hours for day in self.calendar.days[self.near_fillable_day_index:deadline_index])
+
+    def add_task(self, task: Task) -> None:
+        self.calendar.add_task(task, task.work_hours)
+        if self.calendar.near_fillable_day.is_task_filled():
+            self.calendar.next_fillable_day()
+        self.tasks.append(task)
+
+    def report_str_rus(self) -> str:
+        result = f"Исполнитель {self.name}: задач {len(self.tasks)}, часов {self.work_hours}"
+        busy_days = [day for day in self.calendar if day.has_tasks()]
+        if busy_days:
+            result += f", занят до {date_to_normal_str(busy_days[-1].date)}"
+        return result + "\n" + self.calendar.schedule_str_rus()
+
+
+class TeamPlanner:
+    """
+    Allocates one pool of tasks across the calendars of several workers. Tasks are taken in the order of one of
+    the Planner orderings and each goes whole to the worker whose calendar frees up earliest; a deadline task goes
+    to the earliest worker that can still finish it before the deadline.
+    """
+
+    def __init__(self, tasks: [Task] = None, workers: [Worker] = None,
+                 start_date: dt.date = dt.date.today()) -> None:
+        self._start_date: dt.date = start_date
+        self._tasks: [Task] = list(filter(lambda task: task.deadline is None or task.deadline > start_date,
+                                          tasks)) if tasks is not None else []
+        Planner.assign_task_ids(self._tasks)
+        self._workers: [Worker] = [] if workers is None else workers
+        self._failed_tasks: {Task} = set()
+
+    @property
+    def tasks(self) -> [Task]:
+        return self._tasks
+
+    @property
+    def workers(self) -> [Worker]:
+        return self._workers
+
+    @property
+    def failed_tasks(self) -> {Task}:
+        return self._failed_tasks
+
+    def allocate_tasks(self, tasks: [Task]) -> None:
+        for worker in self.workers:
+            worker.clean()
+        failed_tasks = set()
+        worker_heap = [(worker.calendar.near_fillable_day.date, i) for i, worker in enumerate(self.workers)]
+        heapify(worker_heap)
+
+        for task in tasks:
+            worker_i = self.pop_worker_for_task(task, worker_heap)
+            if worker_i is None:
+                failed_tasks.add(task)
+                continue
+            worker = self.workers[worker_i]
+            worker.add_task(task)
+            heappush(worker_heap, (worker.calendar.near_fillable_day.date, worker_i))
+        self._failed_tasks = failed_tasks
+
+    def pop_worker_for_task(self, task: Task, worker_heap: [(dt.date, int)]) -> int:
+        """
+        Pops the earliest free worker able to finish the task before its deadline, or returns None.
+        Workers checked on the way are pushed back.
+        """
+        skipped = []
+        found_worker_i = None
+        while worker_heap:
+            date, worker_i = heappop(worker_heap)
+            if task.deadline is None:
+                found_worker_i = worker_i
+                break
+            skipped.append((date, worker_i))
+            if date >= task.deadline:
+                # every other worker frees up even later
+                break
+            if self.workers[worker_i].get_free_hours_before_date(task.deadline) >= task.work_hours:
+                skipped.pop()
+                found_worker_i = worker_i
+                break
+        for item in skipped:
+            heappush(worker_heap, item)
+        return found_worker_i
+
+    def importance_allocation(self) -> None:
+        self.allocate_tasks(Planner.importance_order(self.tasks))
+
+    def interest_allocation(self) -> None:
+        self.allocate_tasks(Planner.interest_order(self.tasks))
+
+    def interest_importance_allocation(self) -> None:
+        self.allocate_tasks(Planner.interest_importance_order(self.tasks))
+
+    def points_allocation(self) -> None:
+        self.allocate_tasks(Planner.points_order(self.tasks))
+
+    def reports_str_rus(self) -> {str: str}:
+        return {worker.name: worker.report_str_rus() for worker in self.workers}
+
+    def write_result_to_file(self, file_name: str) -> None:
+        result = ""
+        if len(self.failed_tasks):
+            result += "Невыполненные задачи:\n"
+            for task in self.failed_tasks:
+                result += task.present_str_rus() + "\n"
+            result += "\n"
+        result += "\n".join(self.reports_str_rus().values())
+
+        with open(file_name, "w", encoding="utf-8") as f:
+            f.write(result)
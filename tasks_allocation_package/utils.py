@@ -9,6 +9,17 @@ def str_to_date(string):
     return dt.datetime.strptime(string, "%d.%m.%Y").date()
 
 
+def str_to_intervals(string):
+    """
+    "9-12 18-21" -> [(9, 12), (18, 21)]
+    """
+    intervals = []
+    for interval_str in string.split():
+        start, end = interval_str.split("-")
+        intervals.append((int(start), int(end)))
+    return intervals
+
+
 def read_class_instances(class_init, file_name: str, pos_args_names: []) -> []:
     result = []
     for args, kwargs in read_args_kwargs(file_name, pos_args_names):
@@ -0,0 +1,43 @@
+import datetime as dt
+import random
+import unittest
+
+from tasks_allocation_package.classes import Task, Day, Planner
+
+
+class AgingAllocationTest(unittest.TestCase):
+    def assert_invariants(self, planner: Planner) -> None:
+        for day in planner.calendar.days:
+            self.assertLessEqual(day.sum_hours, day.work_hours, f"day {day.date} is over capacity")
+            for task in day.schedule:
+                if task.deadline is not None:
+                    self.assertLess(day.date, task.deadline, f"{task.name} has hours on or after its deadline")
+
+    def test_invariants_on_random_plans(self):
+        rng = random.Random(0)
+        for _ in range(100):
+            start_date = dt.date(2025, 1, 1) + dt.timedelta(days=rng.randrange(365))
+            tasks = [Task(f"task {i}", start_date + dt.timedelta(days=rng.randint(1, 30)) if rng.random() < 0.7
+                          else None, rng.randint(1, 10), rng.randint(1, 12), rng.randint(1, 10))
+                     for i in range(rng.randint(0, 40))]
+            manual_days = [Day(start_date + dt.timedelta(days=rng.randrange(30)), rng.choice([0, 1, 2, 6]))
+                           for _ in range(rng.randint(0, 10))]
+            planner = Planner(tasks, manual_days, start_date=start_date, dflt_day_work_hours=rng.randint(1, 8),
+                              horizon_weeks=rng.choice([None, 2, 6]))
+            planner.aging_allocation(rng.choice([None, 0, 4]))
+            self.assert_invariants(planner)
+
+    def test_equal_tasks_with_equal_ids(self):
+        start_date = dt.date(2025, 1, 1)
+        tasks = [Task("report", start_date + dt.timedelta(days=3), work_hours=4, task_id=0) for _ in range(2)]
+        planner = Planner(tasks, start_date=start_date, dflt_day_work_hours=4)
+        # ids set after the planner was built are not checked, ties must still not compare the tasks
+        for task in planner.tasks:
+            task.id = 0
+        planner.aging_allocation()
+        self.assert_invariants(planner)
+        self.assertEqual(planner.failed_tasks, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import datetime as dt
+import random
+import unittest
+
+from tasks_allocation_package.classes import Task, Day, Planner
+from tasks_allocation_package.slots import FreeIntervals
+
+
+class FreeIntervalsTest(unittest.TestCase):
+    def test_add_free_merges_overlapping_and_touching(self):
+        intervals = FreeIntervals([(9, 12), (18, 21)])
+        intervals.add_free(12, 14)
+        intervals.add_free(17, 19)
+        self.assertEqual(intervals.intervals, [(9, 14), (17, 21)])
+        intervals.add_free(13, 18)
+        self.assertEqual(intervals.intervals, [(9, 21)])
+        self.assertEqual(intervals.free_hours, 12)
+
+    def test_block_splits_and_returns_removed_hours(self):
+        intervals = FreeIntervals([(9, 12), (18, 21)])
+        self.assertEqual(intervals.block(10, 11), 1)
+        self.assertEqual(intervals.intervals, [(9, 10), (11, 12), (18, 21)])
+        self.assertEqual(intervals.block(11, 19), 2)
+        self.assertEqual(intervals.intervals, [(9, 10), (19, 21)])
+        self.assertEqual(intervals.block(0, 5), 0)
+        self.assertEqual(intervals.free_hours, 3)
+
+    def test_first_fit_and_best_fit(self):
+        intervals = FreeIntervals([(8, 11), (13, 15), (18, 23)])
+        self.assertEqual(intervals.first_fit(2), 8)
+        self.assertEqual(intervals.best_fit(2), 13)
+        self.assertEqual(intervals.first_fit(4), 18)
+        self.assertEqual(intervals.best_fit(4), 18)
+        self.assertIsNone(intervals.first_fit(6))
+        self.assertIsNone(intervals.best_fit(6))
+
+    def test_place_and_reset(self):
+        intervals = FreeIntervals([(8, 11), (13, 15)])
+        self.assertEqual(intervals.place("a", 2, best_fit=True), (13, 15))
+        self.assertEqual(intervals.place("b", 2), (8, 10))
+        self.assertIsNone(intervals.place("c", 2))
+        self.assertEqual(intervals.slots, [(13, 15, "a"), (8, 10, "b")])
+        intervals.reset()
+        self.assertEqual(intervals.intervals, [(8, 11), (13, 15)])
+        self.assertEqual(intervals.slots, [])
+
+    def test_block_after_placement_survives_reset(self):
+        intervals = FreeIntervals([(9, 12)])
+        intervals.place("a", 2)
+        self.assertEqual(intervals.block(9, 12), 3)
+        intervals.reset()
+        self.assertEqual(intervals.intervals, [])
+        self.assertIsNone(intervals.place("a", 2))
+
+    def test_day_block_after_allocation(self):
+        start_date = dt.date(2025, 1, 1)
+        day = Day(start_date, free_intervals=[(9, 12)])
+        planner = Planner([Task("report", start_date + dt.timedelta(days=3), work_hours=2)], [day],
+                          start_date=start_date, dflt_day_work_hours=2)
+        planner.importance_allocation()
+        first_day = planner.calendar[0]
+        self.assertEqual([(start, end) for start, end, _ in first_day.slots], [(9, 11)])
+        first_day.block(9, 12)
+        self.assertEqual(first_day.work_hours, 0)
+        planner.importance_allocation()
+        self.assertEqual(first_day.slots, [])
+        self.assertEqual(first_day.schedule, {})
+        self.assertEqual(planner.failed_tasks, set())
+
+    def test_fill_splits_task(self):
+        intervals = FreeIntervals([(9, 10), (12, 14)])
+        self.assertEqual(intervals.fill("a", 4), 1)
+        self.assertEqual(intervals.slots, [(9, 10, "a"), (12, 14, "a")])
+        self.assertEqual(intervals.free_hours, 0)
+
+    def test_lookups_match_brute_force(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            intervals = FreeIntervals()
+            free = set()
+            for _ in range(40):
+                start = rng.randrange(60)
+                end = start + rng.randint(1, 8)
+                if rng.random() < 0.6:
+                    intervals.add_free(start, end)
+                    free |= set(range(start, end))
+                else:
+                    self.assertEqual(intervals.block(start, end), len(free & set(range(start, end))))
+                    free -= set(range(start, end))
+                expected = []
+                for hour in sorted(free):
+                    if expected and expected[-1][1] == hour:
+                        expected[-1][1] = hour + 1
+                    else:
+                        expected.append([hour, hour + 1])
+                self.assertEqual(intervals.intervals, [tuple(interval) for interval in expected])
+                for hours in range(1, 10):
+                    fitting = [(end - start, start) for start, end in expected if end - start >= hours]
+                    first_start = min(start for _, start in fitting) if fitting else None
+                    self.assertEqual(intervals.first_fit(hours), first_start)
+                    self.assertEqual(intervals.best_fit(hours), min(fitting)[1] if fitting else None)
+
+
+if __name__ == "__main__":
+    unittest.main()